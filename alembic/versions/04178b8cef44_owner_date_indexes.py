@@ -0,0 +1,41 @@
+"""owner date indexes
+
+Revision ID: 04178b8cef44
+Revises: 924afaceaa0b
+Create Date: 2026-10-18 10:02:17.530942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '04178b8cef44'
+down_revision: Union[str, None] = '924afaceaa0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sales_owner_id_date', 'sales', ['owner_id', 'date', 'id'],
+            postgresql_include=['item', 'quantity', 'amount'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_expenses_owner_id_date', 'expenses', ['owner_id', 'date', 'id'],
+            postgresql_include=['category', 'amount'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_expenses_owner_id_date', table_name='expenses', postgresql_concurrently=True)
+        op.drop_index('ix_sales_owner_id_date', table_name='sales', postgresql_concurrently=True)
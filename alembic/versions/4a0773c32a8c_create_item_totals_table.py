@@ -0,0 +1,47 @@
+"""create item totals table
+
+Revision ID: 4a0773c32a8c
+Revises: 43685970284c
+Create Date: 2026-10-18 14:05:12.417392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a0773c32a8c'
+down_revision: Union[str, None] = '43685970284c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('item_totals',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('item', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('revenue', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('sales_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id', 'item')
+    )
+    op.create_index('ix_item_totals_owner_id_quantity', 'item_totals',
+                    ['owner_id', sa.text('quantity DESC'), 'item'], unique=False)
+
+    # Backfill from existing rows; `python -m app.db.backfill` does the same later on
+    op.execute("""
+        INSERT INTO item_totals (owner_id, item, quantity, revenue, sales_count)
+        SELECT owner_id, item, COALESCE(SUM(quantity), 0), SUM(amount), COUNT(*)
+        FROM sales WHERE owner_id IS NOT NULL
+        GROUP BY owner_id, item
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_item_totals_owner_id_quantity', table_name='item_totals')
+    op.drop_table('item_totals')
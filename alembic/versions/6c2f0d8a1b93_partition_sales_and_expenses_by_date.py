@@ -0,0 +1,86 @@
+"""partition sales and expenses by date
+
+Revision ID: 6c2f0d8a1b93
+Revises: b7d3e91f2c64
+Create Date: 2026-10-18 16:48:03.115724
+
+Rebuilds `sales` and `expenses` as tables range-partitioned on `date`, with one
+partition per month (or year, see PARTITION_INTERVAL) from the oldest row up to
+PARTITIONS_AHEAD periods past today, plus a default partition. Existing rows are
+copied over, so run it in a maintenance window: both tables are locked while it
+runs. `python -m app.db.partitions ensure` keeps future partitions coming.
+
+Partitioned tables need the partition key in their primary key, so the primary
+keys become (id, date). ids still come from the same sequences and stay unique;
+the ORM keeps mapping `id` as the identity.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.db.partitions import ensure_future_partitions, ensure_partitions
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2f0d8a1b93'
+down_revision: Union[str, None] = 'b7d3e91f2c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes as declared on the models; recreated on the new parent tables, from
+# where Postgres builds them on every partition
+INDEXES = {
+    'sales': [
+        "CREATE INDEX ix_sales_id ON sales (id)",
+        "CREATE INDEX ix_sales_owner_id_date ON sales (owner_id, date, id) INCLUDE (item, quantity, amount)",
+        "CREATE INDEX ix_sales_item_trgm ON sales USING gin (item gin_trgm_ops)",
+    ],
+    'expenses': [
+        "CREATE INDEX ix_expenses_id ON expenses (id)",
+        "CREATE INDEX ix_expenses_owner_id_date ON expenses (owner_id, date, id) INCLUDE (category, amount)",
+        "CREATE INDEX ix_expenses_item_trgm ON expenses USING gin (item gin_trgm_ops)",
+    ],
+}
+
+
+def _rebuild(table: str, partition_clause: str) -> None:
+    # Put an empty copy of `table` in its place, built with `partition_clause`
+    # ('' for a plain table); the old one stays as <table>_old until _finish
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS) {partition_clause}")
+
+
+def _finish(table: str, primary_key: str) -> None:
+    # Copy the rows over, drop the old table and recreate its keys and indexes
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    # The id sequence belongs to the old table; move it before dropping that table
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {table}_old")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})")
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_owner_id_fkey FOREIGN KEY (owner_id) REFERENCES users (id)")
+    for statement in INDEXES[table]:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    interval = settings.partition_interval
+    for table in ('sales', 'expenses'):
+        _rebuild(table, "PARTITION BY RANGE (date)")
+        oldest = conn.execute(sa.text(f"SELECT min(date) FROM {table}_old")).scalar()
+        ensure_partitions(conn, oldest or date.today(), date.today(), interval, tables=(table,))
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        _finish(table, "id, date")
+    ensure_future_partitions(conn, interval=interval)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('sales', 'expenses'):
+        # Dropping the partitioned table drops its partitions with it
+        _rebuild(table, "")
+        _finish(table, "id")
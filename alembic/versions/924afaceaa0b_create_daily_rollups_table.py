@@ -0,0 +1,53 @@
+"""create daily rollups table
+
+Revision ID: 924afaceaa0b
+Revises: 189ab5538b14
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '924afaceaa0b'
+down_revision: Union[str, None] = '189ab5538b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_rollups',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('income', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('expenses', sa.Float(), server_default=sa.text('0'), nullable=False),
+    sa.Column('quantity', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('sales_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('expenses_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id', 'date')
+    )
+
+    # Backfill from existing rows; `python -m app.db.backfill` does the same later on
+    op.execute("""
+        INSERT INTO daily_rollups (owner_id, date, income, expenses, quantity, sales_count, expenses_count)
+        SELECT owner_id, date, SUM(income), SUM(expenses), SUM(quantity), SUM(sales_count), SUM(expenses_count)
+        FROM (
+            SELECT owner_id, date, amount AS income, 0 AS expenses, COALESCE(quantity, 0) AS quantity,
+                   1 AS sales_count, 0 AS expenses_count
+            FROM sales WHERE owner_id IS NOT NULL
+            UNION ALL
+            SELECT owner_id, date, 0, amount, 0, 0, 1
+            FROM expenses WHERE owner_id IS NOT NULL
+        ) AS totals
+        GROUP BY owner_id, date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_rollups')
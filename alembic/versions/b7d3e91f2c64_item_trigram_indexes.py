@@ -0,0 +1,44 @@
+"""item trigram indexes
+
+Revision ID: b7d3e91f2c64
+Revises: 4a0773c32a8c
+Create Date: 2026-10-18 15:21:48.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e91f2c64'
+down_revision: Union[str, None] = '4a0773c32a8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sales_item_trgm', 'sales', ['item'],
+            postgresql_using='gin',
+            postgresql_ops={'item': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_expenses_item_trgm', 'expenses', ['item'],
+            postgresql_using='gin',
+            postgresql_ops={'item': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_expenses_item_trgm', table_name='expenses', postgresql_concurrently=True)
+        op.drop_index('ix_sales_item_trgm', table_name='sales', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""exact rollup totals
+
+Revision ID: d5a8c1e07f42
+Revises: 6c2f0d8a1b93
+Create Date: 2026-10-19 10:12:40.518236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8c1e07f42'
+down_revision: Union[str, None] = '6c2f0d8a1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = [('daily_rollups', 'income'), ('daily_rollups', 'expenses'), ('item_totals', 'revenue')]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column, type_=sa.Numeric(), existing_type=sa.Float(), existing_nullable=False)
+    # Drop rows left behind with nothing in them, and recompute the sums exactly
+    op.execute("DELETE FROM daily_rollups WHERE sales_count = 0 AND expenses_count = 0")
+    op.execute("DELETE FROM item_totals WHERE sales_count = 0")
+    op.execute("""
+        UPDATE daily_rollups r SET
+            income = COALESCE((SELECT SUM(amount::numeric) FROM sales s
+                               WHERE s.owner_id = r.owner_id AND s.date = r.date), 0),
+            expenses = COALESCE((SELECT SUM(amount::numeric) FROM expenses e
+                                 WHERE e.owner_id = r.owner_id AND e.date = r.date), 0)
+    """)
+    op.execute("""
+        UPDATE item_totals t SET
+            revenue = COALESCE((SELECT SUM(amount::numeric) FROM sales s
+                                WHERE s.owner_id = t.owner_id AND s.item = t.item), 0)
+    """)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column, type_=sa.Float(), existing_type=sa.Numeric(), existing_nullable=False)
@@ -0,0 +1,67 @@
+import brotli
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+def accepted_encodings(accept_encoding: str | None) -> set[str]:
+    # Content codings in Accept-Encoding, minus those refused with q=0
+    encodings = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        if not coding.strip():
+            continue
+        _, _, quality = params.partition("q=")
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+def negotiated_encoding(accept_encoding: str | None) -> str:
+    # The content coding CompressionMiddleware uses for bodies big enough to compress
+    encodings = accepted_encodings(accept_encoding)
+    if "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return "identity"
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        body = self.compressor.process(body)
+        return body if more_body else body + self.compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    # Starlette's gzip middleware plus brotli, which clients that send it in
+    # Accept-Encoding get first. Small bodies and already-encoded ones pass
+    # through; streamed bodies (exports) are compressed chunk by chunk.
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 6,
+                 brotli_quality: int = 4) -> None:
+        super().__init__(app, minimum_size, compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiated_encoding(Headers(scope=scope).get("Accept-Encoding"))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
@@ -1,32 +1,136 @@
-from app.db.session import SessionLocal
+from app.db.session import get_database
+from app.db.runner import close_db, run_db
 from app.core.token import verify_access_token
 from app.models.user import User
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from app.crud.user import get_user
+from app.crud.user import get_data_version, get_user
+from app.core.config import settings
+from app.core.cache import MISSING
+from app.services.cache import principal_cache, recent_writes, token_cache
+import secrets
+import time
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+if settings.database_async:
+    async def get_db():
+        async with get_database().AsyncSessionLocal() as db:
+            yield db
+else:
+    def get_db():
+        db = get_database().SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+def get_session_factory():
+    # For handlers that open several sessions of their own
+    database = get_database()
+    return database.AsyncSessionLocal if settings.database_async else database.SessionLocal
         
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token = verify_access_token(token, credentials_exception)
-    user = get_user(db, token.id)
-    if not user:
-        raise credentials_exception
+    user_id = token_cache.get(token)
+    if user_id is MISSING:
+        token_data = verify_access_token(token, credentials_exception)
+        user_id = token_data.id
+        # Never keep a token around past its own expiry
+        ttl = token_cache.ttl_seconds
+        if token_data.exp is not None:
+            ttl = min(ttl, token_data.exp - time.time())
+        if ttl > 0:
+            token_cache.set(token, user_id, tag=user_id, ttl_seconds=ttl)
+    
+    user = principal_cache.get(user_id)
+    if user is MISSING:
+        version = principal_cache.tag_version(user_id)
+        user = await run_db(db, load_principal, user_id)
+        if not user:
+            raise credentials_exception
+        principal_cache.set(user_id, user, tag=user_id, tag_version=version)
     
     return user
 
+async def current_data_version(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> int:
+    # The user's data_version as the primary has it now, one primary-key lookup per
+    # request. The cached principal's copy is only refreshed in the worker that made
+    # the write, so it must not decide ETags or whether the replica is current.
+    return await run_db(db, get_data_version, current_user.id)
+
+def load_principal(db: Session, user_id: int) -> User | None:
+    # The cached user outlives this session, so detach it while it is fully loaded
+    user = get_user(db, user_id)
+    if user is not None:
+        db.expunge(user)
+    return user
+
+async def use_replica(user_id: int, data_version: int) -> bool:
+    # Reads go to the replica unless there is none or it has not replayed the user's
+    # latest write yet, judged against `data_version` as the primary has it now (see
+    # current_data_version), so writes made through any worker count. recent_writes
+    # only saves this worker the replica lookup right after its own writes.
+    ReplicaSessionLocal = get_database().ReplicaSessionLocal
+    if ReplicaSessionLocal is None or recent_writes.get(user_id) is not MISSING:
+        return False
+    replica = ReplicaSessionLocal()
+    try:
+        version = await run_db(replica, get_data_version, user_id)
+    except SQLAlchemyError:
+        return False
+    finally:
+        await close_db(replica)
+    return version is not None and version >= data_version
+
+async def get_read_db(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version)
+):
+    # Session for read-only handlers: the replica when use_replica allows, else get_db's
+    if not await use_replica(current_user.id, data_version):
+        yield db
+        return
+    replica = get_database().ReplicaSessionLocal()
+    try:
+        yield replica
+    finally:
+        await close_db(replica)
+
+async def get_read_session_factory(
+    session_factory=Depends(get_session_factory),
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version)
+):
+    # get_read_db's counterpart for handlers that open their own sessions
+    if await use_replica(current_user.id, data_version):
+        return get_database().ReplicaSessionLocal
+    return session_factory
 
+def verify_internal_token(
+    x_internal_token: str | None = Header(None),
+    authorization: str | None = Header(None)
+) -> None:
+    # Internal endpoints are hidden unless a token is configured, and require it when it is,
+    # as X-Internal-Token or as a bearer token (what Prometheus scrape configs can send)
+    if not settings.internal_api_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = x_internal_token
+    if token is None and authorization:
+        scheme, _, credentials = authorization.partition(" ")
+        if scheme.lower() == "bearer":
+            token = credentials.strip()
+    if not token or not secrets.compare_digest(token, settings.internal_api_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid internal token"
+        )
@@ -0,0 +1,52 @@
+import hashlib
+from fastapi import Depends, Request, Response
+from app.api.compression import negotiated_encoding
+from app.api.deps import current_data_version, get_current_user
+from app.api.responses import preferred_format
+from app.models.user import User
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def make_etag(user_id: int, data_version: int, request: Request) -> str:
+    # The user's data version changes on every sale or expense write, so the same
+    # version, URL, format (JSON or msgpack) and content coding always describe the
+    # same bytes. A strong tag must not be shared by the identity, gzip and brotli
+    # bodies CompressionMiddleware makes of one payload.
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    representation = preferred_format(request.headers.get("Accept"))
+    encoding = negotiated_encoding(request.headers.get("Accept-Encoding"))
+    digest = hashlib.sha256(
+        f"{user_id}:{data_version}:{representation}:{encoding}:{request.url.path}?{query}".encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def etag_guard(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version)
+) -> str:
+    # Route dependency: answers 304 before the handler runs if the client's copy is current
+    etag = make_etag(current_user.id, data_version, request)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        raise NotModified(etag)
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return etag
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": exc.etag, "Cache-Control": "private, no-cache"}
+    )
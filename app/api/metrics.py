@@ -0,0 +1,33 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import finish_request, start_request
+
+
+class MetricsMiddleware:
+    # Latency, SQL statement count and SQL time per request. Requests are labelled
+    # by route template (/api/v1/sales/{sale_id}), not by path, so the number of
+    # series stays bounded; paths that match no route share "unmatched".
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats, token = start_request(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope on the way in
+            route = getattr(scope.get("route"), "path", "unmatched")
+            finish_request(token, stats, scope["method"], route, status_code, time.perf_counter() - started)
@@ -0,0 +1,76 @@
+from contextvars import ContextVar
+from typing import Any
+import msgpack
+import orjson
+from fastapi import Response
+from pydantic_core import to_jsonable_python
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Set per request by ContentNegotiationMiddleware, read when the response is rendered
+_response_format: ContextVar[str] = ContextVar("response_format", default="json")
+
+
+def preferred_format(accept: str | None) -> str:
+    # "msgpack" if the client asks for it at least as strongly as for JSON, else "json"
+    weights = {}
+    for part in (accept or "").split(","):
+        media_type, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[media_type.strip().lower()] = quality
+    msgpack_quality = max(weights.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_quality = weights.get("application/json", weights.get("*/*", 0.0))
+    return "msgpack" if msgpack_quality > 0 and msgpack_quality >= json_quality else "json"
+
+
+class NegotiatedResponse(Response):
+    # The app's default response class: orjson, or msgpack when the request asked
+    # for it. Dates and other non-JSON values render as pydantic renders them.
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if _response_format.get() == "msgpack":
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return msgpack.packb(content, default=to_jsonable_python)
+        return orjson.dumps(
+            content,
+            default=to_jsonable_python,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+def encoded_response(content: Any, response: Response) -> NegotiatedResponse:
+    # Return this from a handler without a response_model to skip FastAPI's
+    # jsonable_encoder pass over `content`. Headers set on the injected response
+    # (ETag, cursor) are carried over, as the returned response replaces it.
+    return NegotiatedResponse(content, headers=response.headers)
+
+
+class ContentNegotiationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header("Accept")
+            await send(message)
+
+        token = _response_format.set(preferred_format(Headers(scope=scope).get("accept")))
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            _response_format.reset(token)
@@ -11,8 +11,73 @@ class Settings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: str
 
+    # Optional read replica for analytics and list reads. Unset parts default to
+    # the primary's settings, so pointing DATABASE_REPLICA_NAMES at a second local
+    # database is enough for development.
+    database_replica_hostname: str | None = None
+    database_replica_port: str | None = None
+    database_replica_names: str | None = None
+    # After a user's own write, their reads stay on the primary for this long
+    replica_read_your_writes_seconds: float = 5
+
+    # Serve requests through asyncpg/AsyncSession instead of psycopg2/Session
+    database_async: bool = False
+
+    # sales/expenses date partitions (once migrated): "month" or "year", and how
+    # many periods past the current one to create in advance
+    partition_interval: str = "month"
+    partitions_ahead: int = 3
+    # Seconds between attempts when they can't be created at startup
+    partition_retry_seconds: float = 30
+
+    # Connection pool, per engine and per worker process
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Connections per pool opened at startup, before /health/ready reports ready
+    # (capped at db_pool_size)
+    db_pool_warmup: int = 2
+    # Slow-query log, off while unset: statements slower than this are kept (the
+    # last slow_query_log_size of them) with an EXPLAIN (ANALYZE, BUFFERS) plan
+    # for SELECTs; see /internal/slow-queries
+    slow_query_threshold_ms: float | None = None
+    slow_query_log_size: int = 100
+    slow_query_explain: bool = True
+
+    # Analytics result cache, per worker process. Entries are keyed by the user's
+    # data_version, so a write through any worker is seen on the next read.
+    analytics_cache_max_entries: int = 1024
+    analytics_cache_ttl_seconds: float = 60
+    # Serve unfiltered top-selling queries from the maintained item_totals table
+    top_selling_precomputed: bool = True
+    # Widgets of one /analytics/batch request computed at the same time
+    analytics_batch_concurrency: int = 4
+    # Widget sessions open at once across all batch requests in a worker. Each holds
+    # a pooled connection, so keep this well below db_pool_size + db_max_overflow.
+    analytics_batch_max_sessions: int = 8
+
+    # Password hashing: bcrypt cost factor, and the dedicated executor's
+    # worker count and queue length (requests beyond that get a 429)
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32
+
+    # Decoded-token and current-user caches used by get_current_user
+    auth_cache_max_entries: int = 10000
+    auth_cache_ttl_seconds: float = 30
+
+    # Token for the /internal endpoints; they are disabled while unset
+    internal_api_token: str | None = None
+
+    # Responses at least this large are compressed (brotli or gzip, per Accept-Encoding)
+    compression_minimum_size: int = 1024
+    gzip_compresslevel: int = 6
+    brotli_quality: int = 4
+
     
     class Config:
         env_file=".env"
     
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,144 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: tuple, values: tuple, *extra: str) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: tuple):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.label_names, labels)} {value}" for labels, value in values)
+        return lines
+
+
+class Histogram:
+    # Cumulative histogram in the Prometheus sense, one series per label combination
+    def __init__(self, name: str, description: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict = {}  # label values -> [count per bucket (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket = _labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class RequestStats:
+    # SQL run while serving one request. Shared with the threads and tasks the
+    # request fans out to (run_db, batch widgets), hence the lock.
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self._lock = threading.Lock()
+        self.statements = 0
+        self.db_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.statements += 1
+            self.db_seconds += seconds
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"), LATENCY_BUCKETS
+)
+REQUEST_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements run per request.", ("method", "route"), STATEMENT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ("method", "route"), LATENCY_BUCKETS
+)
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements run, in or outside requests.", ("engine",))
+DB_SECONDS = Counter("db_statement_seconds_total", "Time spent in SQL statements.", ("engine",))
+
+# (snapshot key, metric name, type, description) for the /internal/pool-stats numbers
+POOL_METRICS = (
+    ("in_use", "db_pool_in_use", "gauge", "Connections checked out."),
+    ("checked_in", "db_pool_idle", "gauge", "Idle connections in the pool."),
+    ("overflow", "db_pool_overflow", "gauge", "Connections open beyond pool_size."),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Connection checkouts."),
+    ("timeouts", "db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection."),
+)
+
+
+def start_request(scope: dict) -> tuple[RequestStats, Token]:
+    stats = RequestStats(scope)
+    return stats, _request_stats.set(stats)
+
+def finish_request(token: Token, stats: RequestStats, method: str, route: str, status: int, seconds: float) -> None:
+    _request_stats.reset(token)
+    REQUEST_DURATION.observe((method, route, status), seconds)
+    REQUEST_STATEMENTS.observe((method, route), stats.statements)
+    REQUEST_DB_SECONDS.observe((method, route), stats.db_seconds)
+
+def record_statement(engine: str, seconds: float) -> None:
+    DB_STATEMENTS.inc((engine,))
+    DB_SECONDS.inc((engine,), seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(seconds)
+
+def current_route() -> str | None:
+    # "GET /api/v1/sales/{sale_id}" for the request being served, once routed
+    stats = _request_stats.get()
+    route = stats and stats.scope.get("route")
+    return f"{stats.scope['method']} {route.path}" if route else None
+
+def render_metrics(pools: dict) -> str:
+    # Everything above plus connection pool numbers, in Prometheus text format.
+    # `pools` maps pool names to PoolStats snapshots.
+    lines = []
+    for metric in (REQUEST_DURATION, REQUEST_STATEMENTS, REQUEST_DB_SECONDS, DB_STATEMENTS, DB_SECONDS):
+        lines.extend(metric.render())
+    for key, name, kind, description in POOL_METRICS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f'{name}{{pool="{_escape(pool)}"}} {snapshot[key]}' for pool, snapshot in pools.items())
+    return "\n".join(lines) + "\n"
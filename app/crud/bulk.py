@@ -0,0 +1,20 @@
+from typing import List
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def insert_rows(db: Session, model, rows: List[dict]) -> List[int]:
+    # Insert `rows` with one multi-row INSERT per chunk and return their ids in the
+    # same order. Postgres does not promise RETURNING follows VALUES order, so the
+    # ids are drawn from the table's sequence first and inserted explicitly.
+    # Runs in the caller's transaction; the caller commits.
+    sequence = func.pg_get_serial_sequence(model.__tablename__, "id")
+    ids = db.execute(
+        select(func.nextval(sequence)).select_from(func.generate_series(1, len(rows)))
+    ).scalars().all()
+    rows = [{**row, "id": row_id} for row, row_id in zip(rows, ids)]
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        db.execute(insert(model).values(rows[start:start + BULK_INSERT_CHUNK_SIZE]))
+    return ids
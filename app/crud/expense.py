@@ -1,7 +1,16 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from app.models.expense import Expense
-from app.schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseUpdate
+from app.schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseRow, ExpenseUpdate
 from typing import List
+from datetime import date, datetime, time
+from app.crud.bulk import insert_rows
+from app.crud.pagination import keyset_page
+from app.crud.search import item_contains
+from app.crud.rollup import record_expense, record_expenses
+from app.crud.user import bump_data_version
+from app.services.cache import invalidate_user_caches
 
 
 def create_expense(db: Session, expense: ExpenseCreate, user_id: int) -> Expense:
@@ -9,30 +18,82 @@ def create_expense(db: Session, expense: ExpenseCreate, user_id: int) -> Expense
         **expense.dict(), owner_id=user_id,
     )
     db.add(db_expense)
+    record_expense(db, db_expense)
+    bump_data_version(db, user_id)
     db.commit()
+    invalidate_user_caches(user_id)
     db.refresh(db_expense)
     return db_expense
 
+def create_expenses_bulk(db: Session, expenses: List[ExpenseCreate], user_id: int) -> List[int]:
+    # One transaction and one multi-row INSERT per chunk, instead of an
+    # add/commit/refresh round trip per expense. ids[i] is the id of expenses[i].
+    rows = [{**expense.dict(), "owner_id": user_id} for expense in expenses]
+    ids = insert_rows(db, Expense, rows)
+    
+    record_expenses(db, user_id, rows)
+    bump_data_version(db, user_id)
+    db.commit()
+    invalidate_user_caches(user_id)
+    return ids
+
 def get_expense(db: Session, expense_id: int) -> Expense | None:
     return db.query(Expense).filter(Expense.id == expense_id).first()
 
-def get_expenses(db: Session, user_id: int, item_name: str | None) -> List[Expense]:
+def get_expenses(db: Session, user_id: int, item_name: str | None,
+                 limit: int | None = None, after: tuple[date, int] | None = None) -> List[Expense]:
     query = db.query(Expense).filter(Expense.owner_id == user_id)
     if item_name:
-        query = query.filter(Expense.item.ilike(f"%{item_name}%"))
+        query = query.filter(item_contains(Expense.item, item_name))
+    
+    return keyset_page(query, Expense, limit, after).all()
+
+def get_expense_rows(db: Session, user_id: int, item_name: str | None,
+                     limit: int | None = None, after: tuple[date, int] | None = None) -> List[ExpenseRow]:
+    # get_expenses as plain dicts shaped like ExpenseResponse. Selecting columns skips
+    # building Expense objects (identity map, owner relationship) for every row.
+    query = select(
+        Expense.item, Expense.amount, Expense.category, Expense.date, Expense.image_path, Expense.id, Expense.owner_id, Expense.created_at
+    ).where(Expense.owner_id == user_id)
+    if item_name:
+        query = query.where(item_contains(Expense.item, item_name))
+    
+    # ExpenseResponse renders the date as a datetime
+    return [
+        {**row._mapping, "date": datetime.combine(row.date, time.min)}
+        for row in db.execute(keyset_page(query, Expense, limit, after))
+    ]
+
+def expenses_export_query(user_id: int, item_name: str | None = None,
+                          start_date: date | None = None, end_date: date | None = None) -> Select:
+    # Plain columns rather than Expense objects, oldest first
+    query = select(
+        Expense.id, Expense.item, Expense.category, Expense.amount, Expense.date, Expense.image_path, Expense.created_at
+    ).where(Expense.owner_id == user_id)
+    if item_name:
+        query = query.where(item_contains(Expense.item, item_name))
+    if start_date:
+        query = query.where(Expense.date >= start_date)
+    if end_date:
+        query = query.where(Expense.date <= end_date)
     
-    return query.order_by(Expense.date.desc()).all()
+    return query.order_by(Expense.date, Expense.id)
 
 def update_expense(db: Session, expense_id: int, expense_update: ExpenseUpdate) -> Expense | None:
     db_expense = db.query(Expense).filter(Expense.id == expense_id).first()
     if not db_expense:
         return None
     
+    # Move the expense's old totals out of the rollup and its new totals in
+    record_expense(db, db_expense, sign=-1)
     for key, value in expense_update.dict(exclude_unset=True).items():
         setattr(db_expense, key, value)
+    record_expense(db, db_expense)
+    bump_data_version(db, db_expense.owner_id)
     print(f"Updating expense {expense_id} with {expense_update.dict(exclude_unset=True)}")  
     db.commit()
     db.refresh(db_expense)
+    invalidate_user_caches(db_expense.owner_id)
     return db_expense
 
 def delete_expense(db: Session, expense_id: int) -> bool:
@@ -40,6 +101,10 @@ def delete_expense(db: Session, expense_id: int) -> bool:
     if not db_expense:
         return False
     
+    record_expense(db, db_expense, sign=-1)
+    owner_id = db_expense.owner_id
+    bump_data_version(db, owner_id)
     db.delete(db_expense)
     db.commit()
+    invalidate_user_caches(owner_id)
     return True
\ No newline at end of file
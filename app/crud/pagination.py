@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import date
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import Select
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(row_date: date, row_id: int) -> str:
+    # Opaque to clients: base64 of the (date, id) of the last row they received
+    payload = json.dumps([row_date.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        row_date, row_id = json.loads(payload)
+        return date.fromisoformat(row_date), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def keyset_page(query: Query | Select, model, limit: int | None,
+                after: tuple[date, int] | None) -> Query | Select:
+    # Newest first, with id breaking ties between rows on the same date. Seeking
+    # past the cursor on the (owner_id, date, id) index makes every page cost the same.
+    if after is not None:
+        query = query.filter(tuple_(model.date, model.id) < tuple_(*after))
+    query = query.order_by(model.date.desc(), model.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
@@ -0,0 +1,188 @@
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import Numeric, cast, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.rollup import DailyRollup, ItemTotal
+from app.models.sales import Sale
+from app.models.expense import Expense
+
+ROLLUP_COLUMNS = ["owner_id", "date", "income", "expenses", "quantity", "sales_count", "expenses_count"]
+TOTAL_COLUMNS = ROLLUP_COLUMNS[2:]
+ITEM_TOTAL_COLUMNS = ["owner_id", "item", "quantity", "revenue", "sales_count"]
+
+
+def _as_date(value: date | datetime) -> date:
+    # Schemas accept datetimes but the tables store plain dates
+    return value.date() if isinstance(value, datetime) else value
+
+def _money(amount: float) -> Decimal:
+    # The amount as Postgres converts float8 to numeric (15 significant digits), so
+    # deltas summed here match SUM(amount::numeric) in rebuild_rollups exactly
+    return Decimal(f"{amount:.15g}")
+
+def _accumulate(stmt):
+    # Add the incoming totals to an existing (owner_id, date) row instead of failing
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyRollup.owner_id, DailyRollup.date],
+        set_={column: getattr(DailyRollup, column) + getattr(stmt.excluded, column) for column in TOTAL_COLUMNS}
+    )
+
+def _accumulate_items(stmt):
+    # Same as _accumulate, for (owner_id, item) rows
+    return stmt.on_conflict_do_update(
+        index_elements=[ItemTotal.owner_id, ItemTotal.item],
+        set_={column: getattr(ItemTotal, column) + getattr(stmt.excluded, column) for column in ITEM_TOTAL_COLUMNS[2:]}
+    )
+
+def apply_rollup_delta(db: Session, owner_id: int, day: date | datetime, income: Decimal = Decimal(0),
+                       expenses: Decimal = Decimal(0), quantity: int = 0, sales_count: int = 0,
+                       expenses_count: int = 0) -> None:
+    # Runs in the caller's transaction; the caller commits
+    day = _as_date(day)
+    stmt = insert(DailyRollup).values(
+        owner_id=owner_id,
+        date=day,
+        income=income,
+        expenses=expenses,
+        quantity=quantity,
+        sales_count=sales_count,
+        expenses_count=expenses_count,
+    )
+    db.execute(_accumulate(stmt))
+    if sales_count < 0 or expenses_count < 0:
+        # A rebuild has no row for a day without sales or expenses
+        db.execute(delete(DailyRollup).where(
+            DailyRollup.owner_id == owner_id,
+            DailyRollup.date == day,
+            DailyRollup.sales_count == 0,
+            DailyRollup.expenses_count == 0,
+        ))
+
+def apply_item_delta(db: Session, owner_id: int, item: str, quantity: int = 0,
+                     revenue: Decimal = Decimal(0), sales_count: int = 0) -> None:
+    # Runs in the caller's transaction; the caller commits
+    stmt = insert(ItemTotal).values(
+        owner_id=owner_id,
+        item=item,
+        quantity=quantity,
+        revenue=revenue,
+        sales_count=sales_count,
+    )
+    db.execute(_accumulate_items(stmt))
+    if sales_count < 0:
+        db.execute(delete(ItemTotal).where(
+            ItemTotal.owner_id == owner_id, ItemTotal.item == item, ItemTotal.sales_count == 0
+        ))
+
+def record_sale(db: Session, sale: Sale, sign: int = 1) -> None:
+    apply_rollup_delta(
+        db, sale.owner_id, sale.date,
+        income=sign * _money(sale.amount),
+        quantity=sign * (sale.quantity or 0),
+        sales_count=sign,
+    )
+    apply_item_delta(
+        db, sale.owner_id, sale.item,
+        quantity=sign * (sale.quantity or 0),
+        revenue=sign * _money(sale.amount),
+        sales_count=sign,
+    )
+
+def record_expense(db: Session, expense: Expense, sign: int = 1) -> None:
+    apply_rollup_delta(
+        db, expense.owner_id, expense.date,
+        expenses=sign * _money(expense.amount),
+        expenses_count=sign,
+    )
+
+def record_sales(db: Session, owner_id: int, sales: list[dict]) -> None:
+    # Bulk counterpart of record_sale: one multi-row upsert with a row per distinct day,
+    # and one with a row per distinct item
+    totals = {}
+    item_totals = {}
+    for sale in sales:
+        quantity = sale.get("quantity") or 0
+        day = totals.setdefault(_as_date(sale["date"]), [Decimal(0), 0, 0])
+        day[0] += _money(sale["amount"])
+        day[1] += quantity
+        day[2] += 1
+        item = item_totals.setdefault(sale["item"], [0, Decimal(0), 0])
+        item[0] += quantity
+        item[1] += _money(sale["amount"])
+        item[2] += 1
+    _apply_daily_totals(db, [
+        {"owner_id": owner_id, "date": day, "income": income, "expenses": Decimal(0),
+         "quantity": quantity, "sales_count": count, "expenses_count": 0}
+        for day, (income, quantity, count) in totals.items()
+    ])
+    if item_totals:
+        db.execute(_accumulate_items(insert(ItemTotal).values([
+            {"owner_id": owner_id, "item": item, "quantity": quantity, "revenue": revenue, "sales_count": count}
+            for item, (quantity, revenue, count) in item_totals.items()
+        ])))
+
+def record_expenses(db: Session, owner_id: int, expenses: list[dict]) -> None:
+    # Bulk counterpart of record_expense
+    totals = {}
+    for expense in expenses:
+        day = totals.setdefault(_as_date(expense["date"]), [Decimal(0), 0])
+        day[0] += _money(expense["amount"])
+        day[1] += 1
+    _apply_daily_totals(db, [
+        {"owner_id": owner_id, "date": day, "income": Decimal(0), "expenses": amount,
+         "quantity": 0, "sales_count": 0, "expenses_count": count}
+        for day, (amount, count) in totals.items()
+    ])
+
+def _apply_daily_totals(db: Session, rows: list[dict]) -> None:
+    # Rows must have distinct (owner_id, date) keys: ON CONFLICT cannot touch a row twice
+    if rows:
+        db.execute(_accumulate(insert(DailyRollup).values(rows)))
+
+def rebuild_rollups(db: Session, owner_id: int | None = None) -> None:
+    # Recompute rollups from the raw tables, for one user or for everybody
+    for model in (DailyRollup, ItemTotal):
+        delete_query = db.query(model)
+        if owner_id is not None:
+            delete_query = delete_query.filter(model.owner_id == owner_id)
+        delete_query.delete(synchronize_session=False)
+    
+    sales_totals = select(
+        Sale.owner_id,
+        Sale.date,
+        func.sum(cast(Sale.amount, Numeric)),
+        literal(0),
+        func.coalesce(func.sum(Sale.quantity), 0),
+        func.count(),
+        literal(0),
+    ).where(Sale.owner_id.isnot(None)).group_by(Sale.owner_id, Sale.date)
+    
+    expenses_totals = select(
+        Expense.owner_id,
+        Expense.date,
+        literal(0),
+        func.sum(cast(Expense.amount, Numeric)),
+        literal(0),
+        literal(0),
+        func.count(),
+    ).where(Expense.owner_id.isnot(None)).group_by(Expense.owner_id, Expense.date)
+    
+    item_totals = select(
+        Sale.owner_id,
+        Sale.item,
+        func.coalesce(func.sum(Sale.quantity), 0),
+        func.sum(cast(Sale.amount, Numeric)),
+        func.count(),
+    ).where(Sale.owner_id.isnot(None)).group_by(Sale.owner_id, Sale.item)
+    
+    if owner_id is not None:
+        sales_totals = sales_totals.where(Sale.owner_id == owner_id)
+        expenses_totals = expenses_totals.where(Expense.owner_id == owner_id)
+        item_totals = item_totals.where(Sale.owner_id == owner_id)
+    
+    for totals in (sales_totals, expenses_totals):
+        db.execute(_accumulate(insert(DailyRollup).from_select(ROLLUP_COLUMNS, totals)))
+    db.execute(insert(ItemTotal).from_select(ITEM_TOTAL_COLUMNS, item_totals))
+    
+    db.commit()
@@ -1,38 +1,98 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 from app.models.sales import Sale
-from app.schemas.sales import SaleCreate, SaleResponse, SaleUpdate
+from app.schemas.sales import SaleCreate, SaleResponse, SaleRow, SaleUpdate
 from typing import List
+from datetime import date, datetime, time
+from app.crud.bulk import insert_rows
+from app.crud.pagination import keyset_page
+from app.crud.search import item_contains
+from app.crud.rollup import record_sale, record_sales
+from app.crud.user import bump_data_version
+from app.services.cache import invalidate_user_caches
 
 def create_sale(db: Session, sale: SaleCreate, user_id: int) -> Sale:
     db_sale = Sale(
         **sale.dict(), owner_id=user_id,
     )
     db.add(db_sale)
+    record_sale(db, db_sale)
+    bump_data_version(db, user_id)
     db.commit()
+    invalidate_user_caches(user_id)
     db.refresh(db_sale)
     return db_sale
 
+def create_sales_bulk(db: Session, sales: List[SaleCreate], user_id: int) -> List[int]:
+    # One transaction and one multi-row INSERT per chunk, instead of an
+    # add/commit/refresh round trip per sale. ids[i] is the id of sales[i].
+    rows = [{**sale.dict(), "owner_id": user_id} for sale in sales]
+    ids = insert_rows(db, Sale, rows)
+    
+    record_sales(db, user_id, rows)
+    bump_data_version(db, user_id)
+    db.commit()
+    invalidate_user_caches(user_id)
+    return ids
+
 def get_sale(db: Session, sale_id: int) -> Sale | None:
     return db.query(Sale).filter(Sale.id == sale_id).first()
 
-def get_sales(db: Session, user_id: int, item_name: str | None) -> List[Sale]:
+def get_sales(db: Session, user_id: int, item_name: str | None,
+              limit: int | None = None, after: tuple[date, int] | None = None) -> List[Sale]:
     query = db.query(Sale).filter(Sale.owner_id == user_id)
-    print(type(query)) 
     if item_name:
-        query = query.filter(Sale.item.ilike(f"%{item_name}%"))
+        query = query.filter(item_contains(Sale.item, item_name))
+    
+    return keyset_page(query, Sale, limit, after).all()
+
+def get_sale_rows(db: Session, user_id: int, item_name: str | None,
+                  limit: int | None = None, after: tuple[date, int] | None = None) -> List[SaleRow]:
+    # get_sales as plain dicts shaped like SaleResponse. Selecting columns skips
+    # building Sale objects (identity map, owner relationship) for every row.
+    query = select(
+        Sale.item, Sale.quantity, Sale.amount, Sale.date, Sale.image_path, Sale.id, Sale.owner_id, Sale.created_at
+    ).where(Sale.owner_id == user_id)
+    if item_name:
+        query = query.where(item_contains(Sale.item, item_name))
+    
+    # SaleResponse renders the date as a datetime
+    return [
+        {**row._mapping, "date": datetime.combine(row.date, time.min)}
+        for row in db.execute(keyset_page(query, Sale, limit, after))
+    ]
+
+def sales_export_query(user_id: int, item_name: str | None = None,
+                       start_date: date | None = None, end_date: date | None = None) -> Select:
+    # Plain columns rather than Sale objects, oldest first
+    query = select(
+        Sale.id, Sale.item, Sale.quantity, Sale.amount, Sale.date, Sale.image_path, Sale.created_at
+    ).where(Sale.owner_id == user_id)
+    if item_name:
+        query = query.where(item_contains(Sale.item, item_name))
+    if start_date:
+        query = query.where(Sale.date >= start_date)
+    if end_date:
+        query = query.where(Sale.date <= end_date)
     
-    return query.order_by(Sale.date.desc()).all()
+    return query.order_by(Sale.date, Sale.id)
 
 def update_sale(db: Session, sale_id: int, sale_update: SaleUpdate) -> Sale | None:
     db_sale = db.query(Sale).filter(Sale.id == sale_id).first()
     if not db_sale:
         return None
     
+    # Move the sale's old totals out of the rollup and its new totals in
+    record_sale(db, db_sale, sign=-1)
     for key, value in sale_update.dict(exclude_unset=True).items():
         setattr(db_sale, key, value)
+    record_sale(db, db_sale)
+    bump_data_version(db, db_sale.owner_id)
     
     db.commit()
     db.refresh(db_sale)
+    invalidate_user_caches(db_sale.owner_id)
     return db_sale
 
 def delete_sale(db: Session, sale_id: int) -> bool:
@@ -40,6 +100,10 @@ def delete_sale(db: Session, sale_id: int) -> bool:
     if not db_sale:
         return False
     
+    record_sale(db, db_sale, sign=-1)
+    owner_id = db_sale.owner_id
+    bump_data_version(db, owner_id)
     db.delete(db_sale)
     db.commit()
+    invalidate_user_caches(owner_id)
     return True
\ No newline at end of file
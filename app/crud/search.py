@@ -0,0 +1,33 @@
+from sqlalchemy import func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+from app.models.expense import Expense
+from app.models.sales import Sale
+
+
+def escape_like(value: str) -> str:
+    # Make %, _ and \ in user input match literally
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def item_contains(column, value: str):
+    # Case-insensitive substring match. The pg_trgm GIN index on `column` serves it
+    # (for values of three characters or more) instead of a scan of every owned row.
+    return column.ilike(f"%{escape_like(value)}%", escape="\\")
+
+def search_items(db: Session, user_id: int, query: str, limit: int) -> list:
+    # Distinct sale and expense item names that contain `query` or are similar to it
+    # (pg_trgm's % operator), best match first
+    def matches(model, source: str):
+        return select(
+            model.item.label("item"),
+            literal(source).label("source"),
+            func.similarity(model.item, query).label("score"),
+            func.count().label("count")
+        ).where(
+            model.owner_id == user_id,
+            or_(model.item.op("%")(query), item_contains(model.item, query))
+        ).group_by(model.item)
+
+    results = union_all(matches(Sale, "sale"), matches(Expense, "expense")).subquery()
+    return db.execute(
+        select(results).order_by(results.c.score.desc(), results.c.item, results.c.source).limit(limit)
+    ).all()
@@ -10,8 +10,10 @@ def get_user(db: Session, user_id: int) -> User | None:
 def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = hash_password(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None) -> User:
+    # Routes hash on the password executor and pass the result in
+    if hashed_password is None:
+        hashed_password = hash_password(user.password)
     db_user = User(
         email=user.email,
         password=hashed_password,
@@ -21,4 +23,11 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.refresh(db_user)
     return db_user
 
+def bump_data_version(db: Session, user_id: int) -> None:
+    # Runs in the caller's write transaction; the caller commits
+    db.query(User).filter(User.id == user_id).update(
+        {User.data_version: User.data_version + 1}, synchronize_session=False
+    )
 
+def get_data_version(db: Session, user_id: int) -> int | None:
+    return db.query(User.data_version).filter(User.id == user_id).scalar()
@@ -0,0 +1,22 @@
+import argparse
+from app.db.session import get_database
+from app.crud.rollup import rebuild_rollups
+
+
+def main() -> None:
+    # Rebuild the daily rollups and item totals from the sales and expenses tables.
+    # Usage: python -m app.db.backfill [--user-id ID]
+    parser = argparse.ArgumentParser(description="Rebuild daily sales/expense rollups and item totals.")
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    db = get_database().SessionLocal()
+    try:
+        rebuild_rollups(db, args.user_id)
+    finally:
+        db.close()
+    print(f"Rebuilt rollups for {'user ' + str(args.user_id) if args.user_id else 'all users'}")
+
+
+if __name__ == "__main__":
+    main()
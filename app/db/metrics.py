@@ -0,0 +1,16 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import record_statement
+
+
+def track_statements(engine: Engine, name: str) -> None:
+    # Count every statement and its time, globally under `name` and for the
+    # request being served (see MetricsMiddleware). Async engines pass their sync_engine.
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        record_statement(name, time.perf_counter() - context._metrics_started_at)
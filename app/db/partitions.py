@@ -0,0 +1,143 @@
+import argparse
+import re
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+
+# Tables range-partitioned on `date` by the 6c2f0d8a1b93 migration
+PARTITIONED_TABLES = ("sales", "expenses")
+
+_BOUND = re.compile(r"FROM \('([0-9-]+)'\) TO \('([0-9-]+)'\)")
+
+
+def partition_start(day: date, interval: str = "month") -> date:
+    # First day of the partition holding `day`
+    return date(day.year, 1, 1) if interval == "year" else date(day.year, day.month, 1)
+
+def next_partition_start(start: date, interval: str = "month") -> date:
+    if interval == "year" or start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+def partition_name(table: str, start: date, interval: str = "month") -> str:
+    return f"{table}_p{start:%Y}" if interval == "year" else f"{table}_p{start:%Y_%m}"
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ).scalar()
+
+def default_partition(conn: Connection, table: str) -> str | None:
+    return conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(:table) AND child.relpartbound IS NOT NULL
+          AND pg_get_expr(child.relpartbound, child.oid) = 'DEFAULT'
+    """), {"table": table}).scalar()
+
+def create_partition(conn: Connection, table: str, name: str, start: date, end: date) -> None:
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    default = default_partition(conn, table)
+    in_range = {"start": start, "end": end}
+    if default is None or not conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE date >= :start AND date < :end)"), in_range
+    ).scalar():
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+        return
+    # Rows dated in this range already sit in the default partition (written past
+    # PARTITIONS_AHEAD), and Postgres refuses a new partition that would leave them
+    # there. Build it as a plain table, move them over and attach it instead.
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE date >= :start AND date < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), in_range)
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+
+def ensure_partitions(conn: Connection, first: date, last: date, interval: str = "month",
+                      tables: tuple = PARTITIONED_TABLES) -> list[str]:
+    # Create any missing partition between the ones holding `first` and `last`.
+    # Tables that are not partitioned (e.g. built by create_all) are skipped.
+    # Workers starting together all call this; the lock (held until the caller's
+    # transaction ends) makes them take turns, so a partition is only created once.
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": __name__})
+    created = []
+    for table in tables:
+        if not is_partitioned(conn, table):
+            continue
+        start = partition_start(first, interval)
+        while start <= last:
+            end = next_partition_start(start, interval)
+            name = partition_name(table, start, interval)
+            exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+            if not exists:
+                create_partition(conn, table, name, start, end)
+                created.append(name)
+            start = end
+    return created
+
+def ensure_future_partitions(conn: Connection, ahead: int | None = None, interval: str | None = None) -> list[str]:
+    # Keep partitions for the current period and the next `ahead` ones, so new
+    # rows never land in the default partition
+    interval = interval or settings.partition_interval
+    ahead = settings.partitions_ahead if ahead is None else ahead
+    last = partition_start(date.today(), interval)
+    for _ in range(ahead):
+        last = next_partition_start(last, interval)
+    return ensure_partitions(conn, date.today(), last, interval)
+
+def list_partitions(conn: Connection, table: str) -> list[tuple[str, date, date]]:
+    # (name, start, end) for every range partition of `table`, oldest first
+    rows = conn.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(:table)
+    """), {"table": table}).all()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound)
+        if match:
+            partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def detach_partitions_before(conn: Connection, table: str, before: date) -> list[str]:
+    # Detach (not drop) partitions whose rows are all older than `before`. They stay
+    # around as plain tables to archive or drop. Not CONCURRENTLY: Postgres refuses
+    # that on tables with a default partition, which both partitioned tables have.
+    detached = []
+    for name, _, end in list_partitions(conn, table):
+        if end <= before:
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            detached.append(name)
+    return detached
+
+
+def main() -> None:
+    # Usage: python -m app.db.partitions ensure [--ahead N]
+    #        python -m app.db.partitions detach TABLE --before YYYY-MM-DD
+    from app.db.session import get_database
+
+    parser = argparse.ArgumentParser(description="Manage sales/expenses date partitions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create partitions for the coming periods")
+    ensure.add_argument("--ahead", type=int, default=None, help="periods to create ahead of the current one")
+    detach = commands.add_parser("detach", help="detach partitions older than a date")
+    detach.add_argument("table", choices=PARTITIONED_TABLES)
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    args = parser.parse_args()
+
+    engine = get_database().engine
+    if args.command == "ensure":
+        with engine.begin() as conn:
+            created = ensure_future_partitions(conn, args.ahead)
+        print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+    else:
+        with engine.begin() as conn:
+            detached = detach_partitions_before(conn, args.table, args.before)
+        print(f"Detached {len(detached)} partitions: {', '.join(detached) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
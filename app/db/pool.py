@@ -0,0 +1,114 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    # Counters for one engine's connection pool. Live gauges (in use, overflow)
+    # are read from the pool itself when a snapshot is taken.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_in_use = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+
+    def record_checkout(self, wait_seconds: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_close(self) -> None:
+        with self._lock:
+            self.connections_closed += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "in_use": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": 1000 * self.total_wait_seconds / self.checkouts if self.checkouts else 0.0,
+                "max_wait_ms": 1000 * self.max_wait_seconds,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+            }
+
+
+# Keyed by the pool's logging name, which survives pool.recreate()
+_pool_stats: dict = {}
+
+
+def pool_stats(name: str) -> PoolStats:
+    return _pool_stats.setdefault(name, PoolStats())
+
+
+class _TimedCheckout:
+    # There is no pool event fired before a checkout starts waiting, so the
+    # wait for a free connection is timed around the pool's own _do_get.
+    def _do_get(self):
+        stats = pool_stats(self._orig_logging_name)
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            stats.record_timeout(time.perf_counter() - started)
+            raise
+        stats.record_checkout(time.perf_counter() - started, self.checkedout())
+        return record
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine) -> None:
+    # Count physical connects/closes so recycling and pre-ping churn show up
+    stats = pool_stats(engine.pool._orig_logging_name)
+    event.listen(engine, "connect", lambda dbapi_conn, record: stats.record_connect())
+    event.listen(engine, "close", lambda dbapi_conn, record: stats.record_close())
+
+def warm_pool(engine, connections: int) -> None:
+    # Open `connections` connections at once and return them to the pool, so the
+    # first requests after startup don't each pay for connecting and authenticating
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            opened.append(engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+
+async def warm_async_pool(engine, connections: int) -> None:
+    # warm_pool for an AsyncEngine
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            opened.append(await engine.connect())
+    finally:
+        for conn in opened:
+            await conn.close()
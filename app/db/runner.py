@@ -0,0 +1,50 @@
+import sys
+from typing import TYPE_CHECKING, Any, Callable
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, sessionmaker
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _asyncio_ext():
+    # sqlalchemy.ext.asyncio, if anything has imported it yet. No async session or
+    # engine can exist before then, so sync deployments never import it (~70 ms).
+    return sys.modules.get("sqlalchemy.ext.asyncio")
+
+def is_async(obj) -> bool:
+    # True for an AsyncSession or an AsyncEngine
+    ext = _asyncio_ext()
+    return ext is not None and isinstance(obj, (ext.AsyncSession, ext.AsyncEngine))
+
+def is_async_factory(session_factory: sessionmaker) -> bool:
+    ext = _asyncio_ext()
+    return ext is not None and issubclass(session_factory.class_, ext.AsyncSession)
+
+async def run_db(db: "Session | AsyncSession", fn: Callable[..., Any], *args, **kwargs) -> Any:
+    # Run a CRUD or analytics function `fn(db, ...)` without blocking the event loop.
+    # On an AsyncSession it runs through run_sync: the same code issues its queries over
+    # asyncpg and awaits them, with no thread involved. On a sync Session it goes to the
+    # threadpool, which is what sync route handlers did before.
+    if is_async(db):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+async def run_db_isolated(session_factory: sessionmaker, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    # Like run_db, but on a new session (and so its own pooled connection), so that
+    # several calls can run at once. The session is closed before returning.
+    if is_async_factory(session_factory):
+        async with session_factory() as db:
+            return await db.run_sync(fn, *args, **kwargs)
+
+    def call():
+        with session_factory() as db:
+            return fn(db, *args, **kwargs)
+    return await run_in_threadpool(call)
+
+async def close_db(db: "Session | AsyncSession") -> None:
+    # Closing a sync session may roll back over the network, so not on the event loop
+    if is_async(db):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
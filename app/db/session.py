@@ -1,16 +1,110 @@
+from functools import lru_cache
 from sqlalchemy import create_engine
 from sqlalchemy.engine.url import URL
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.metrics import track_statements
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+from app.db.slow_queries import track_slow_queries
 
-DATABASE_URL = URL.create(
-    "postgresql+psycopg2",
-    username=settings.database_username,
-    password=settings.database_password,
-    host=settings.database_hostname,
-    port=settings.database_port,
-    database=settings.database_names
+POOL_OPTIONS = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
 )
-print(DATABASE_URL, settings.database_names)
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+
+
+def database_url() -> URL:
+    return URL.create(
+        "postgresql+psycopg2",
+        username=settings.database_username,
+        password=settings.database_password,
+        host=settings.database_hostname,
+        port=settings.database_port,
+        database=settings.database_names
+    )
+
+def _instrument(engine, name: str) -> None:
+    # Async engines are instrumented through their sync_engine
+    instrument_engine(engine)
+    track_statements(engine, name)
+    track_slow_queries(engine, name)
+
+
+class Database:
+    # The process's engines and session factories. Creating an engine imports the
+    # DB driver but opens no connection; use get_database() rather than building
+    # one directly, so that happens once and only when something needs the database.
+    def __init__(self):
+        self.url = database_url()
+        self.engine = create_engine(
+            self.url, poolclass=InstrumentedQueuePool, pool_logging_name="primary", **POOL_OPTIONS
+        )
+        _instrument(self.engine, "primary")
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        # Async path (DATABASE_ASYNC=true): asyncpg engine and AsyncSession. Objects stay
+        # loaded after commit because lazy loads cannot run outside the session's greenlet.
+        self.async_engine = None
+        self.AsyncSessionLocal = None
+        if settings.database_async:
+            from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+            self.async_engine = create_async_engine(
+                self.url.set(drivername="postgresql+asyncpg"),
+                poolclass=InstrumentedAsyncQueuePool,
+                pool_logging_name="async",
+                **POOL_OPTIONS
+            )
+            _instrument(self.async_engine.sync_engine, "async")
+            self.AsyncSessionLocal = sessionmaker(
+                bind=self.async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+            )
+
+        # Read replica (DATABASE_REPLICA_HOSTNAME and/or DATABASE_REPLICA_NAMES set): a second,
+        # read-only engine for analytics and list reads; see get_read_db. Unset parts of its
+        # URL default to the primary's, so a second database on the same server also works.
+        # Its sessions run with default_transaction_read_only, so a write routed there by
+        # mistake fails instead of landing in whatever database the replica URL points at.
+        self.replica_engine = None
+        self.ReplicaSessionLocal = None
+        if settings.database_replica_hostname or settings.database_replica_names:
+            replica_url = self.url.set(
+                host=settings.database_replica_hostname or settings.database_hostname,
+                port=settings.database_replica_port or settings.database_port,
+                database=settings.database_replica_names or settings.database_names,
+            )
+            if settings.database_async:
+                self.replica_engine = create_async_engine(
+                    replica_url.set(drivername="postgresql+asyncpg"),
+                    poolclass=InstrumentedAsyncQueuePool,
+                    pool_logging_name="replica",
+                    connect_args={"server_settings": {"default_transaction_read_only": "on"}},
+                    **POOL_OPTIONS
+                )
+                _instrument(self.replica_engine.sync_engine, "replica")
+                self.ReplicaSessionLocal = sessionmaker(
+                    bind=self.replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+                )
+            else:
+                self.replica_engine = create_engine(
+                    replica_url,
+                    poolclass=InstrumentedQueuePool,
+                    pool_logging_name="replica",
+                    connect_args={"options": "-c default_transaction_read_only=on"},
+                    **POOL_OPTIONS
+                )
+                _instrument(self.replica_engine, "replica")
+                self.ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.replica_engine)
+
+    def engines(self) -> dict:
+        # Every engine in use, by pool name
+        engines = {"primary": self.engine, "async": self.async_engine, "replica": self.replica_engine}
+        return {name: engine for name, engine in engines.items() if engine is not None}
+
+
+@lru_cache(maxsize=None)
+def get_database() -> Database:
+    return Database()
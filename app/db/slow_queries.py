@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import current_route
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_LENGTH = 10000
+MAX_PARAMETER_SETS = 5
+# Where the code that issued a statement is looked for, innermost frame first
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CALLER_DIRS = tuple(os.path.join(_APP_DIR, name) + os.sep for name in ("services", "crud"))
+
+
+class SlowQueryLog:
+    # Ring buffer of the most recent slow statements. Entries are dicts; the plan
+    # is filled in later, once the background EXPLAIN finishes.
+    def __init__(self, max_entries: int):
+        self._entries: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, entry: dict) -> dict:
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        return entry
+
+    def entries(self) -> list[dict]:
+        # Newest first, as copies: plans are still being filled in on the originals
+        with self._lock:
+            return [dict(entry) for entry in reversed(self._entries)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_log_size)
+
+# EXPLAIN ANALYZE runs the statement a second time, so at most two run at once
+# and slow statements arriving while both are busy go without a plan
+_explain_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="explain")
+_explain_slots = threading.BoundedSemaphore(2)
+# The event loop only keeps weak references to tasks
+_explain_tasks: set = set()
+
+
+def _caller() -> str | None:
+    # The innermost app/services or app/crud function on the stack, as module.function:line
+    frame = sys._getframe()
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_CALLER_DIRS):
+            return f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+def _parameters(parameters, executemany: bool):
+    if executemany:
+        return list(parameters[:MAX_PARAMETER_SETS])
+    return dict(parameters) if isinstance(parameters, dict) else list(parameters or ())
+
+def _explainable(statement: str) -> bool:
+    # EXPLAIN ANALYZE executes the statement, so only plain reads qualify
+    return statement.lstrip()[:6].upper() == "SELECT"
+
+def _explain(engine: Engine, statement: str, parameters, entry: dict) -> None:
+    try:
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+        entry["plan"] = "\n".join(row[0] for row in rows)
+        entry["plan_status"] = "done"
+    except Exception as e:
+        logger.warning("EXPLAIN of a slow query failed: %s", e)
+        entry["plan_status"] = "error"
+    finally:
+        _explain_slots.release()
+
+async def _explain_async(engine: Engine, statement: str, parameters, entry: dict) -> None:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+    try:
+        async with AsyncEngine(engine).connect() as conn:
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        entry["plan"] = "\n".join(row[0] for row in result.all())
+        entry["plan_status"] = "done"
+    except Exception as e:
+        logger.warning("EXPLAIN of a slow query failed: %s", e)
+        entry["plan_status"] = "error"
+    finally:
+        _explain_slots.release()
+
+def _schedule_explain(engine: Engine, statement: str, parameters, entry: dict) -> None:
+    if not _explain_slots.acquire(blocking=False):
+        entry["plan_status"] = "skipped"
+        return
+    entry["plan_status"] = "pending"
+    if engine.dialect.is_async:
+        # Called from inside the event loop (in the greenlet running the query)
+        task = asyncio.get_running_loop().create_task(_explain_async(engine, statement, parameters, entry))
+        _explain_tasks.add(task)
+        task.add_done_callback(_explain_tasks.discard)
+    else:
+        _explain_executor.submit(_explain, engine, statement, parameters, entry)
+
+def track_slow_queries(engine: Engine, name: str) -> None:
+    # Opt-in (SLOW_QUERY_THRESHOLD_MS). Async engines pass their sync_engine.
+    if settings.slow_query_threshold_ms is None:
+        return
+    threshold = settings.slow_query_threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def check_duration(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._slow_query_started_at
+        # The EXPLAINs run by this log are not logged themselves
+        if seconds < threshold or statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        entry = slow_query_log.record({
+            "engine": name,
+            "duration_ms": round(seconds * 1000, 3),
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "parameters": _parameters(parameters, executemany),
+            "caller": _caller(),
+            "route": current_route(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+            "plan_status": "not_explained",
+        })
+        if settings.slow_query_explain and not executemany and _explainable(statement):
+            _schedule_explain(engine, statement, parameters, entry)
@@ -1,16 +1,109 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routes import user, auth, sales, expenses, analytics
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from app.routes import user, auth, sales, expenses, analytics, internal, search, health
+from app.api.compression import CompressionMiddleware
+from app.api.etag import NotModified, not_modified_handler
+from app.api.metrics import MetricsMiddleware
+from app.api.responses import ContentNegotiationMiddleware, NegotiatedResponse
+from app.core.config import settings
+from app.db.partitions import ensure_future_partitions
+from app.db.pool import warm_async_pool, warm_pool
+from app.db.runner import is_async
+from app.db.session import get_database
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Analytics API", version="1.0.0")
 
-@app.get("/")
-async def root():
-    return {"message": "Hello World. This is an invoice service."}
+def create_upcoming_partitions(engine) -> bool:
+    # No-op until the partitioning migration has run. An unreachable database or a
+    # lock or DDL timeout is logged rather than raised, so it can't fail the boot.
+    try:
+        with engine.begin() as conn:
+            ensure_future_partitions(conn)
+    except SQLAlchemyError as e:
+        logger.error("Could not create upcoming partitions: %s", e)
+        return False
+    return True
 
-app.include_router(user.router, prefix="/api/v1", tags=["users"])
-app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
-app.include_router(sales.router, prefix="/api/v1", tags=["sales"])
-app.include_router(expenses.router, prefix="/api/v1", tags=["expenses"])
-app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"]) 
+async def warm_up_pools(database) -> None:
+    # A pool that can't be warmed is not fatal: /health/ready reports whether the
+    # database is reachable, and requests connect on demand as before
+    for name, engine in database.engines().items():
+        try:
+            if is_async(engine):
+                await warm_async_pool(engine, settings.db_pool_warmup)
+            else:
+                await run_in_threadpool(warm_pool, engine, settings.db_pool_warmup)
+        except Exception as e:
+            logger.warning("Could not warm up the %s connection pool: %s", name, e)
 
+async def finish_start_up(app: FastAPI, database) -> None:
+    # Runs when lifespan couldn't create the partitions: retries until that works,
+    # then finishes starting up. Meanwhile the worker serves, and /health/ready
+    # answers 503.
+    while True:
+        await asyncio.sleep(settings.partition_retry_seconds)
+        if await run_in_threadpool(create_upcoming_partitions, database.engine):
+            break
+    await warm_up_pools(database)
+    app.state.ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The engines are built here rather than at import, so importing the app
+    # (tests, tooling, the worker's master process) opens and configures nothing
+    database = get_database()
+    retrying = None
+    if await run_in_threadpool(create_upcoming_partitions, database.engine):
+        await warm_up_pools(database)
+        app.state.ready = True
+    else:
+        retrying = asyncio.create_task(finish_start_up(app, database))
+    yield
+    app.state.ready = False
+    if retrying is not None:
+        retrying.cancel()
+    for engine in database.engines().values():
+        if is_async(engine):
+            await engine.dispose()
+        else:
+            engine.dispose()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="Analytics API", version="1.0.0", default_response_class=NegotiatedResponse, lifespan=lifespan
+    )
+    app.state.ready = False
+    app.add_exception_handler(NotModified, not_modified_handler)
+    app.add_middleware(ContentNegotiationMiddleware)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        compresslevel=settings.gzip_compresslevel,
+        brotli_quality=settings.brotli_quality
+    )
+    # Outermost, so the latency includes encoding and compression
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/")
+    async def root():
+        return {"message": "Hello World. This is an invoice service."}
+
+    app.include_router(user.router, prefix="/api/v1", tags=["users"])
+    app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
+    app.include_router(sales.router, prefix="/api/v1", tags=["sales"])
+    app.include_router(expenses.router, prefix="/api/v1", tags=["expenses"])
+    app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
+    app.include_router(search.router, prefix="/api/v1", tags=["search"])
+    app.include_router(internal.router, prefix="/api/v1", tags=["internal"])
+    app.include_router(internal.metrics_router)
+    app.include_router(health.router)
+    return app
+
+
+app = create_app()
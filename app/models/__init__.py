@@ -1,5 +1,6 @@
 from .user import User
 from .sales import Sale
 from .expense import Expense
+from .rollup import DailyRollup, ItemTotal
 
-from .base import Base 
\ No newline at end of file
+from .base import Base 
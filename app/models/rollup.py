@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, Index, Numeric, String, text
+from app.models.base import Base
+
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+    
+    # One row per user per day, kept in step with sales and expenses by the CRUD layer.
+    # Money is summed as exact numeric, so adding and removing amounts never drifts
+    # from a rebuild; it is still read back as float, like the amounts themselves.
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    income = Column(Numeric(asdecimal=False), nullable=False, server_default=text("0"))
+    expenses = Column(Numeric(asdecimal=False), nullable=False, server_default=text("0"))
+    quantity = Column(Integer, nullable=False, server_default=text("0"))
+    sales_count = Column(Integer, nullable=False, server_default=text("0"))
+    expenses_count = Column(Integer, nullable=False, server_default=text("0"))
+
+
+class ItemTotal(Base):
+    __tablename__ = "item_totals"
+    
+    # One row per user per sold item, kept in step with sales like DailyRollup.
+    # Serves the top-selling query when it has no date or item filter.
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item = Column(String, primary_key=True)
+    quantity = Column(Integer, nullable=False, server_default=text("0"))
+    revenue = Column(Numeric(asdecimal=False), nullable=False, server_default=text("0"))
+    sales_count = Column(Integer, nullable=False, server_default=text("0"))
+
+
+# Matches the top-selling order, so the first N rows are read straight off the index
+Index("ix_item_totals_owner_id_quantity", ItemTotal.owner_id, ItemTotal.quantity.desc(), ItemTotal.item)
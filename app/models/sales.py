@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, Float, String, TIMESTAMP,text
+from sqlalchemy import Column, Integer, ForeignKey, Date, Float, String, TIMESTAMP, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from app.models.user import User
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        # Every list and analytics query filters on owner_id and then date;
+        # the included columns let top-selling aggregate from the index alone
+        Index("ix_sales_owner_id_date", "owner_id", "date", "id",
+              postgresql_include=["item", "quantity", "amount"]),
+        # Substring and similarity search on item names (pg_trgm)
+        Index("ix_sales_item_trgm", "item", postgresql_using="gin", postgresql_ops={"item": "gin_trgm_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     item = Column(String, nullable=False)
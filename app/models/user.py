@@ -9,4 +9,5 @@ class User(Base):
     email = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text('now()'), nullable=False)
-    
\ No newline at end of file
+    # Bumped in the same transaction as every sale or expense write; drives ETags
+    data_version = Column(Integer, nullable=False, server_default=text('0'))
@@ -1,22 +1,31 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
-from app.services.analytics import (get_expense_breakdown, 
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from app.services.analytics import (DEFAULT_MONTHLY_SUMMARY_YEAR, get_dashboard, get_expense_breakdown, 
                                     get_financial_summary as get_financial_summary_db, 
-                                    get_monthly_summary, 
+                                    get_monthly_summary, get_timeseries,
                                     get_top_selling_items, get_weekly_summary)
-from app.api.deps import get_db, get_current_user
+from app.api.deps import current_data_version, get_current_user, get_read_db, get_read_session_factory
+from app.api.etag import etag_guard
+from app.api.responses import encoded_response
 from app.models.user import User
 from sqlalchemy.orm import Session
+from app.db.runner import run_db
+from app.core.config import settings
+from app.schemas.analytics import BatchRequest, BatchResponse
+from app.services.batch import run_widgets
+from sqlalchemy.orm import sessionmaker
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 # Financial Summary Endpoint
 # This endpoint provides a summary of financial data including total income, expenses, and net profit.
 # It allows filtering by date range.
-@router.get("/summary")
-def get_financial_summary(
-    db: Session = Depends(get_db),
+@router.get("/summary", dependencies=[Depends(etag_guard)])
+async def get_financial_summary(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version),
     start_date: str = Query(None),
     end_date: str = Query(None)
 ):
@@ -30,7 +39,9 @@ def get_financial_summary(
             status_code=400,
             detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
         )
-    summary = get_financial_summary_db(db, current_user.id, start_date, end_date)
+    summary = await run_db(
+        db, get_financial_summary_db, current_user.id, start_date, end_date, data_version=data_version
+    )
     
     if not summary:
         raise HTTPException(
@@ -38,15 +49,17 @@ def get_financial_summary(
             detail="No financial data found for the specified period."
         )
     
-    return summary
+    return encoded_response(summary, response)
 
 # Top Selling Items Endpoint
 # This endpoint retrieves the top-selling items for a user within a specified date range.
 # It allows limiting the number of items returned.
-@router.get("/top-selling")
-def top_selling_items(
-    db: Session = Depends(get_db),
+@router.get("/top-selling", dependencies=[Depends(etag_guard)])
+async def top_selling_items(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version),
     start_date: str = Query(None),
     end_date: str = Query(None),
     limit: int = Query(5, ge=1, le=50),
@@ -62,35 +75,51 @@ def top_selling_items(
             detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
         )
         
-    return get_top_selling_items(
+    return encoded_response(await run_db(
         db,
+        get_top_selling_items,
         current_user.id,
         start_date,
         end_date,
         limit,
-        item
-    )
+        item,
+        data_version=data_version
+    ), response)
   
 # Monthly Summary Endpoint
-# This endpoint provides a monthly summary of financial data for a specific year.
+# This endpoint provides a monthly summary of financial data for a specific year,
+# or for every year from `year` to `end_year` when a multi-year range is requested.
 # It returns total income, expenses, and net profit for each month.  
-@router.get("/monthly-summary")
-def monthly_summary(
-    db: Session = Depends(get_db),
+@router.get("/monthly-summary", dependencies=[Depends(etag_guard)])
+async def monthly_summary(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-    year: int = Query(2001, ge=2000, le=2050),
-    
+    data_version: int = Depends(current_data_version),
+    year: int = Query(DEFAULT_MONTHLY_SUMMARY_YEAR, ge=2000, le=2050),
+    end_year: int | None = Query(None, ge=2000, le=2050),
 ):
-    return get_monthly_summary(
-        db,
-        current_user.id,
-        year
-    )
+    try:
+        return encoded_response(await run_db(
+            db,
+            get_monthly_summary,
+            current_user.id,
+            year,
+            end_year,
+            data_version=data_version
+        ), response)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     
-@router.get("/weekly-summary")
-def weekly_summary(
-    db: Session = Depends(get_db),
+@router.get("/weekly-summary", dependencies=[Depends(etag_guard)])
+async def weekly_summary(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version),
     start_date: str = Query(None),
     end_date: str = Query(None)
 ):
@@ -108,19 +137,29 @@ def weekly_summary(
             detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
         )
 
-    return get_weekly_summary(
-        db,
-        current_user.id,
-        start_date,
-        end_date
-    )
+    try:
+        return encoded_response(await run_db(
+            db,
+            get_weekly_summary,
+            current_user.id,
+            start_date,
+            end_date,
+            data_version=data_version
+        ), response)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
 
 # Expense Breakdown Endpoint
 # This endpoint provides a breakdown of expenses by category for a specific date range.
-@router.get("/expense-breakdown")
-def expense_breakdown(
-    db: Session = Depends(get_db),
+@router.get("/expense-breakdown", dependencies=[Depends(etag_guard)])
+async def expense_breakdown(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version),
     start_date: str = Query(None),
     end_date: str = Query(None)
 ):
@@ -133,11 +172,109 @@ def expense_breakdown(
             detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
         )
 
-    return get_expense_breakdown(
+    return encoded_response(await run_db(
         db,
+        get_expense_breakdown,
         current_user.id,
         start_date,
-        end_date
-    )
-    
+        end_date,
+        data_version=data_version
+    ), response)
 
+# Dashboard Endpoint
+# Returns the summary, monthly-summary, top-selling and expense-breakdown charts
+# together, computed from one query per table instead of one request per chart.
+# Each section has the same shape as the corresponding endpoint.
+@router.get("/dashboard", dependencies=[Depends(etag_guard)])
+async def dashboard(
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version),
+    year: int | None = Query(None, ge=2000, le=2050),
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    limit: int = Query(5, ge=1, le=50)
+):
+    try:
+        start_date = datetime.fromisoformat(start_date) if start_date else None
+        end_date = datetime.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
+        )
+
+    return encoded_response(await run_db(
+        db,
+        get_dashboard,
+        current_user.id,
+        year or date.today().year,
+        start_date,
+        end_date,
+        limit,
+        data_version=data_version
+    ), response)
+
+# Time Series Endpoint
+# Income, expenses and net profit per day, week, month, quarter or year over a
+# date range, with empty buckets included. `item` filters the income side by sale
+# item and `category` filters the expense side by expense category.
+@router.get("/timeseries", dependencies=[Depends(etag_guard)])
+async def timeseries(
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version),
+    granularity: str = Query("month", pattern="^(day|week|month|quarter|year)$"),
+    start_date: str = Query(...),
+    end_date: str = Query(None),
+    item: str | None = Query(None, min_length=1, max_length=100),
+    category: str | None = Query(None, min_length=1, max_length=100)
+):
+    try:
+        start_date = datetime.fromisoformat(start_date)
+        end_date = datetime.fromisoformat(end_date) if end_date else datetime.combine(date.today(), datetime.min.time())
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
+        )
+
+    try:
+        return encoded_response(await run_db(
+            db,
+            get_timeseries,
+            current_user.id,
+            granularity,
+            start_date,
+            end_date,
+            item,
+            category,
+            data_version=data_version
+        ), response)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+
+# Batch Endpoint
+# Computes a list of widgets, each matching one of the endpoints above, in one
+# request. Widgets run concurrently on separate connections; results keep the
+# request order and a failing widget carries its own status and error.
+@router.post("/batch", response_model=BatchResponse)
+async def batch(
+    request: BatchRequest,
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(current_data_version)
+):
+    results = await run_widgets(
+        session_factory,
+        current_user.id,
+        request.widgets,
+        settings.analytics_batch_concurrency,
+        data_version
+    )
+    return {"results": results}
@@ -4,9 +4,10 @@ from fastapi.security.oauth2 import OAuth2PasswordRequestForm
 
 
 from sqlalchemy.orm import Session
+from app.db.runner import run_db
 from app.api.deps import get_db
 from app.crud.user import get_user_by_email
-from app.core.security import verify_password
+from app.core.security import PasswordHashingBusy, verify_password_async
 from app.core.token import create_access_token
 
 
@@ -14,11 +15,19 @@ from app.core.token import create_access_token
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login",)
-def login(
+async def login(
     db: Session = Depends(get_db),
     user_credentials: OAuth2PasswordRequestForm = Depends()):
-    user = get_user_by_email(db, user_credentials.username)
-    if not user or not verify_password(user_credentials.password, user.password):
+    user = await run_db(db, get_user_by_email, user_credentials.username)
+    try:
+        valid = bool(user) and await verify_password_async(user_credentials.password, user.password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
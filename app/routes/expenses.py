@@ -1,15 +1,25 @@
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_read_db
+from app.api.etag import etag_guard
+from app.api.responses import encoded_response
 from app.models.expense import Expense
 from app.crud.expense import (
     create_expense as create_expense_db,
+    create_expenses_bulk,
     get_expense as get_expense_db,
-    get_expenses as get_expenses_db,
+    get_expense_rows,
+    expenses_export_query,
     update_expense as update_expense_db,
     delete_expense as delete_expense_db
 )
 from app.schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseUpdate
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.schemas.bulk import MAX_BULK_ROWS, BulkCreateResponse
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from app.db.runner import run_db
+from datetime import datetime
+from app.services.export import export_response
 from typing import List
 from app.models.user import User
 
@@ -17,12 +27,12 @@ from app.models.user import User
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
 @router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
-def create_expense(
+async def create_expense(
     expense: ExpenseCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> ExpenseResponse:
-    new_expense = create_expense_db(db, expense, current_user.id)
+    new_expense = await run_db(db, create_expense_db, expense, current_user.id)
     if not new_expense:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,13 +47,58 @@ def create_expense(
     return new_expense
 
 
+# Bulk Create Endpoint
+# Inserts up to MAX_BULK_ROWS expenses in a single transaction and returns their ids in order.
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_expenses_bulk_route(
+    expenses: List[ExpenseCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> BulkCreateResponse:
+    if not expenses:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No expenses provided"
+        )
+    if len(expenses) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_ROWS} expenses per request"
+        )
+    
+    return {"ids": await run_db(db, create_expenses_bulk, expenses, current_user.id)}
+
+# Export Endpoint
+# Streams every matching expense as CSV or NDJSON without loading them all into memory.
+# Declared before /{expense_id} so that "export" is not parsed as an id.
+@router.get("/export")
+async def export_expenses(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    item_name: str | None = None,
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    try:
+        start_date = datetime.fromisoformat(start_date).date() if start_date else None
+        end_date = datetime.fromisoformat(end_date).date() if end_date else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
+        )
+    
+    query = expenses_export_query(current_user.id, item_name, start_date, end_date)
+    return export_response(db, query, export_format, "expenses")
+
 @router.get("/{expense_id}", response_model=ExpenseResponse)
-def read_expense(
+async def read_expense(
     expense_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> ExpenseResponse:
-    expense = get_expense_db(db, expense_id)
+    expense = await run_db(db, get_expense_db, expense_id)
     if not expense or expense.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -51,35 +106,46 @@ def read_expense(
         )
     return expense
 
-@router.get("/", response_model=List[ExpenseResponse])
-def read_expenses(
+@router.get("/", response_model=List[ExpenseResponse], dependencies=[Depends(etag_guard)])
+async def read_expenses(
+    response: Response,
     item_name: str | None = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> List[ExpenseResponse]:
-    expenses = get_expenses_db(db, current_user.id, item_name)
-    if not expenses:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No expenses found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
-    return expenses
+    
+    # Fetch one extra row to learn whether there is a next page
+    expenses = await run_db(db, get_expense_rows, current_user.id, item_name, limit + 1, after)
+    if len(expenses) > limit:
+        expenses = expenses[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(expenses[-1]["date"].date(), expenses[-1]["id"])
+    # Rendered as is rather than validated through ExpenseResponse
+    return encoded_response(expenses, response)
 
 @router.put("/{expense_id}", response_model=ExpenseResponse)
-def update_expense(
+async def update_expense(
     expense_id: int,
     expense_update: ExpenseUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> ExpenseResponse:
-    expense = get_expense_db(db, expense_id)
+    expense = await run_db(db, get_expense_db, expense_id)
     if not expense or expense.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found"
         )
     
-    updated_expense = update_expense_db(db, expense_id, expense_update)
+    updated_expense = await run_db(db, update_expense_db, expense_id, expense_update)
     if not updated_expense:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -89,19 +155,19 @@ def update_expense(
     return updated_expense
 
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(
+async def delete_expense(
     expense_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    expense = get_expense_db(db, expense_id)
+    expense = await run_db(db, get_expense_db, expense_id)
     if not expense or expense.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found"
         )
     
-    if not delete_expense_db(db, expense_id):
+    if not await run_db(db, delete_expense_db, expense_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to delete expense"
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from app.api.deps import get_session_factory
+from app.db.runner import run_db_isolated
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+def ping(db) -> None:
+    db.execute(text("SELECT 1"))
+
+# Liveness Endpoint
+# The process is up and serving; never touches the database, so a database
+# outage doesn't get every worker restarted.
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+# Readiness Endpoint
+# 503 until startup (partitions, pool warm-up) has finished and whenever the
+# primary database can't be reached.
+@router.get("/ready")
+async def ready(request: Request, session_factory: sessionmaker = Depends(get_session_factory)):
+    if not request.app.state.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Starting up")
+    try:
+        await run_db_isolated(session_factory, ping)
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    return {"status": "ok"}
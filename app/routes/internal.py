@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from app.api.deps import verify_internal_token
+from app.core.config import settings
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+from app.db.pool import pool_stats
+from app.db.session import get_database
+from app.db.slow_queries import slow_query_log
+from app.services.cache import analytics_cache, principal_cache, token_cache
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(verify_internal_token)])
+# Mounted at the app root, where Prometheus scrapes by default
+metrics_router = APIRouter(tags=["internal"], dependencies=[Depends(verify_internal_token)])
+
+# Cache Stats Endpoint
+# Hit/miss/eviction counters for the in-process caches, for sizing them.
+@router.get("/cache-stats")
+def cache_stats():
+    return {
+        "analytics": analytics_cache.stats(),
+        "tokens": token_cache.stats(),
+        "principals": principal_cache.stats(),
+    }
+
+# Pool Stats Endpoint
+# Connection pool usage and checkout wait times, for sizing the pool against
+# the number of workers.
+@router.get("/pool-stats")
+def get_pool_stats():
+    return {name: pool_stats(name).snapshot(engine.pool) for name, engine in get_database().engines().items()}
+
+# Slow Queries Endpoint
+# The most recent statements over SLOW_QUERY_THRESHOLD_MS, newest first, with
+# the code and route that ran them and, for SELECTs, their EXPLAIN ANALYZE plan.
+@router.get("/slow-queries")
+def slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    return {
+        "enabled": settings.slow_query_threshold_ms is not None,
+        "threshold_ms": settings.slow_query_threshold_ms,
+        "recorded": slow_query_log.recorded,
+        "queries": slow_query_log.entries()[:limit],
+    }
+
+# Metrics Endpoint
+# Request latency, SQL statements and SQL time per route, plus the pool numbers
+# above, in Prometheus text format.
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(get_pool_stats()), media_type=PROMETHEUS_CONTENT_TYPE)
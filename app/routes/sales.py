@@ -1,21 +1,29 @@
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 from app.models.user import User
 from app.api.deps import get_current_user
-from app.crud.sales import create_sale as create_sale_db, get_sale, get_sales, update_sale as update_sale_db, delete_sale as delete_sale_db
+from app.api.etag import etag_guard
+from app.api.responses import encoded_response
+from app.crud.sales import create_sale as create_sale_db, create_sales_bulk, get_sale, get_sale_rows, sales_export_query, update_sale as update_sale_db, delete_sale as delete_sale_db
 from app.schemas.sales import SaleCreate, SaleResponse, SaleUpdate
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.schemas.bulk import MAX_BULK_ROWS, BulkCreateResponse
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from app.db.runner import run_db
+from datetime import datetime
+from app.services.export import export_response
 from typing import List
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
 @router.post("/", response_model=SaleResponse, status_code=status.HTTP_201_CREATED)
-def create_sale(
+async def create_sale(
     sale: SaleCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> SaleResponse:
-    new_sale = create_sale_db(db, sale, current_user.id)
+    new_sale = await run_db(db, create_sale_db, sale, current_user.id)
     if not new_sale:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,13 +38,58 @@ def create_sale(
 
     return new_sale
 
+# Bulk Create Endpoint
+# Inserts up to MAX_BULK_ROWS sales in a single transaction and returns their ids in order.
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_sales_bulk_route(
+    sales: List[SaleCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> BulkCreateResponse:
+    if not sales:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No sales provided"
+        )
+    if len(sales) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_ROWS} sales per request"
+        )
+    
+    return {"ids": await run_db(db, create_sales_bulk, sales, current_user.id)}
+
+# Export Endpoint
+# Streams every matching sale as CSV or NDJSON without loading them all into memory.
+# Declared before /{sale_id} so that "export" is not parsed as an id.
+@router.get("/export")
+async def export_sales(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    item_name: str | None = None,
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    try:
+        start_date = datetime.fromisoformat(start_date).date() if start_date else None
+        end_date = datetime.fromisoformat(end_date).date() if end_date else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid date format. Use ISO format (YYYY-MM-DD)."
+        )
+    
+    query = sales_export_query(current_user.id, item_name, start_date, end_date)
+    return export_response(db, query, export_format, "sales")
+
 @router.get("/{sale_id}", response_model=SaleResponse)
-def read_sale(
+async def read_sale(
     sale_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> SaleResponse:
-    sale = get_sale(db, sale_id)
+    sale = await run_db(db, get_sale, sale_id)
     if not sale or sale.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -44,30 +97,46 @@ def read_sale(
         )
     return sale
 
-@router.get("/", response_model=List[SaleResponse])
-def read_sales(
+@router.get("/", response_model=List[SaleResponse], dependencies=[Depends(etag_guard)])
+async def read_sales(
+    response: Response,
     item_name: str | None = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> List[SaleResponse]:
-    sales = get_sales(db, current_user.id, item_name)
-    return sales
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    # Fetch one extra row to learn whether there is a next page
+    sales = await run_db(db, get_sale_rows, current_user.id, item_name, limit + 1, after)
+    if len(sales) > limit:
+        sales = sales[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(sales[-1]["date"].date(), sales[-1]["id"])
+    # Rendered as is rather than validated through SaleResponse
+    return encoded_response(sales, response)
 
 @router.put("/{sale_id}", response_model=SaleResponse)
-def update_sale(
+async def update_sale(
     sale_id: int,
     sale_update: SaleUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> SaleResponse:
-    sale = get_sale(db, sale_id)
+    sale = await run_db(db, get_sale, sale_id)
     if not sale or sale.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sale not found"
         )
     
-    updated_sale = update_sale_db(db, sale_id, sale_update)
+    updated_sale = await run_db(db, update_sale_db, sale_id, sale_update)
     if not updated_sale:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,19 +145,19 @@ def update_sale(
     return updated_sale
 
 @router.delete("/{sale_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_sale(
+async def delete_sale(
     sale_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    sale = get_sale(db, sale_id)
+    sale = await run_db(db, get_sale, sale_id)
     if not sale or sale.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sale not found"
         )
     
-    if not delete_sale_db(db, sale_id):
+    if not await run_db(db, delete_sale_db, sale_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to delete sale"
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.api.deps import get_current_user, get_read_db
+from app.api.etag import etag_guard
+from app.crud.search import search_items
+from app.db.runner import run_db
+from app.models.user import User
+from app.schemas.search import ItemSearchResponse
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+# Item Search Endpoint
+# Sale and expense item names matching `q`, ranked by trigram similarity.
+@router.get("/items", response_model=ItemSearchResponse, dependencies=[Depends(etag_guard)])
+async def search_item_names(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    results = await run_db(db, search_items, current_user.id, q, limit)
+    return {"results": results}
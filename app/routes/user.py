@@ -4,30 +4,40 @@ from app.crud.user import create_user, get_user, get_user_by_email
 from app.schemas.user import UserCreate, UserResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.db.runner import run_db
+from app.core.security import PasswordHashingBusy, hash_password_async
 from typing import List
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_new_user(
+async def create_new_user(
     user: UserCreate,
     db: Session = Depends(get_db)
 ) -> UserResponse:
-    existing_user = get_user_by_email(db, user.email)
+    existing_user = await run_db(db, get_user_by_email, user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    new_user = create_user(db, user)
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many signups in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    new_user = await run_db(db, create_user, user, hashed_password)
     return new_user
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(
+async def read_user(
     user_id: int,
     db: Session = Depends(get_db)
 ) -> UserResponse:
-    user = get_user(db, user_id)
+    user = await run_db(db, get_user, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
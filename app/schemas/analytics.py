@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal
+
+# Most widgets accepted by one POST /analytics/batch request
+MAX_BATCH_WIDGETS = 20
+
+class WidgetSpec(BaseModel):
+    # One chart, named after its standalone endpoint. Arguments a widget type
+    # does not take are ignored.
+    type: Literal["summary", "monthly_summary", "weekly_summary", "top_selling", "expense_breakdown",
+                  "timeseries", "dashboard"]
+    start_date: datetime | None = None
+    end_date: datetime | None = None
+    year: int | None = Field(None, ge=2000, le=2050)
+    end_year: int | None = Field(None, ge=2000, le=2050)
+    limit: int = Field(5, ge=1, le=50)
+    item: str | None = Field(None, min_length=1, max_length=100)
+    category: str | None = Field(None, min_length=1, max_length=100)
+    granularity: Literal["day", "week", "month", "quarter", "year"] = "month"
+
+class BatchRequest(BaseModel):
+    widgets: List[WidgetSpec] = Field(..., min_length=1, max_length=MAX_BATCH_WIDGETS)
+
+class WidgetResult(BaseModel):
+    status: int
+    data: dict | None = None
+    error: str | None = None
+
+class BatchResponse(BaseModel):
+    results: List[WidgetResult]
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import List
+
+# Largest batch accepted by the bulk create endpoints
+MAX_BULK_ROWS = 10000
+
+class BulkCreateResponse(BaseModel):
+    ids: List[int]
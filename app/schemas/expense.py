@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import TypedDict
 
 
 class ExpenseBase(BaseModel):
@@ -28,4 +29,16 @@ class ExpenseUpdate(BaseModel):
     image_path: str | None = None
 
     class Config:  
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ExpenseRow(TypedDict):
+    # ExpenseResponse as a plain dict, as built from column rows for lists. The rows
+    # come straight from the database, so they are rendered without validation.
+    item: str
+    amount: float
+    category: str
+    date: datetime
+    image_path: str | None
+    id: int
+    owner_id: int
+    created_at: datetime
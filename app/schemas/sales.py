@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import TypedDict
 
 class SaleBase(BaseModel):
     item: str
@@ -28,4 +29,15 @@ class SaleUpdate(BaseModel):
 
     class Config:
         orm_mode = True
-    
\ No newline at end of file
+
+class SaleRow(TypedDict):
+    # SaleResponse as a plain dict, as built from column rows for lists. The rows
+    # come straight from the database, so they are rendered without validation.
+    item: str
+    quantity: int
+    amount: float
+    date: datetime
+    image_path: str | None
+    id: int
+    owner_id: int
+    created_at: datetime
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Literal
+
+class ItemMatch(BaseModel):
+    item: str
+    source: Literal["sale", "expense"]
+    score: float
+    count: int
+
+    class Config:
+        orm_mode = True
+
+class ItemSearchResponse(BaseModel):
+    results: List[ItemMatch]
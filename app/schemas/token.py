@@ -6,4 +6,5 @@ class Token(BaseModel):
     
 class TokenData(BaseModel):
     id: int | None = None
+    exp: int | None = None
      
\ No newline at end of file
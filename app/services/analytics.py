@@ -1,43 +1,51 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import DateTime, Integer, and_, case, cast, extract, func, literal_column, or_, true
 from app.api.deps import get_current_user
 from app.models.sales import Sale
 from app.models.expense import Expense  
-from datetime import datetime, timedelta
+from app.models.rollup import DailyRollup, ItemTotal
+from app.core.config import settings
+from app.crud.search import item_contains
+from app.services.cache import cached_analytics
+from datetime import date, datetime, timedelta
 from typing import List
 
 from app.models.user import User
 
+@cached_analytics
 def get_financial_summary(db: Session, 
                           user_id: int, 
                           start_date: datetime = None,
                           end_date: datetime = None) -> dict:
     
-    sales_query = db.query(func.sum(Sale.amount)).filter(
-        Sale.owner_id == user_id,       
-    )
-    expenses_query = db.query(func.sum(Expense.amount)).filter(
-        Expense.owner_id == user_id,
+    # Income and expenses come from the daily rollup in a single query
+    query = db.query(
+        func.sum(DailyRollup.income).label("income"),
+        func.sum(DailyRollup.expenses).label("expenses")
+    ).filter(
+        DailyRollup.owner_id == user_id,
     )
     
     if start_date and end_date:
-        sales_query = sales_query.filter(
-            Sale.date.between(start_date, end_date)
-        )
-        expenses_query = expenses_query.filter(
-            Expense.date.between(start_date, end_date)
+        query = query.filter(
+            DailyRollup.date.between(start_date, end_date)
         )
     
+    totals = query.one()
+    
     # Total income from sales
-    total_income = sales_query.scalar() or 0.0
+    total_income = totals.income or 0.0
     
     # Total expenses 
-    total_expenses = expenses_query.scalar() or 0.0
+    total_expenses = totals.expenses or 0.0
+
+    return _summary_chart(total_income, total_expenses)
+
 
+def _summary_chart(total_income: float, total_expenses: float) -> dict:
     net_profit = total_income - total_expenses
     
-    # 
     return {
         "labels": ["Income", "Expenses", "Net Profit"],
         "datasets": [
@@ -48,37 +56,65 @@ def get_financial_summary(db: Session,
         ]
     }
 
-    
+
+def _rollup_totals(db: Session, user_id: int, buckets: list, start_date: date, end_date: date) -> dict:
+    # One grouped query over the daily rollup, keyed by the bucket columns.
+    # Its cost depends on the number of days in the range, not on the number of rows.
+    rows = db.query(
+        *buckets,
+        func.sum(DailyRollup.income).label("income"),
+        func.sum(DailyRollup.expenses).label("expenses")
+    ).filter(
+        DailyRollup.owner_id == user_id,
+        DailyRollup.date >= start_date,
+        DailyRollup.date < end_date
+    ).group_by(*buckets).all()
+
+    return {
+        tuple(int(value) for value in row[:len(buckets)]): (float(row.income or 0.0), float(row.expenses or 0.0))
+        for row in rows
+    }
+
+
+@cached_analytics
 def get_monthly_summary(db: Session, 
                         user_id: int, 
-                        year: int) -> dict:
+                        year: int,
+                        end_year: int | None = None) -> dict:
+    end_year = end_year or year
+    if end_year < year:
+        raise ValueError("End year cannot be earlier than start year.")
+
+    start_date = date(year, 1, 1)
+    end_date = date(end_year + 1, 1, 1)
+
+    totals_by_month = _rollup_totals(
+        db, user_id,
+        [extract("year", DailyRollup.date), extract("month", DailyRollup.date)],
+        start_date, end_date
+    )
+
+    return _monthly_chart(year, end_year, totals_by_month)
+
+
+def _monthly_chart(year: int, end_year: int, totals_by_month: dict) -> dict:
     labels = []
     income_data = []
     expense_data = []
     profit_data = []
-    
-    for month in range(1, 13):
-        start_date = datetime(year, month, 1)
-        end_date = datetime(year, month + 1, 1) if month < 12 else datetime(year + 1, 1, 1)
-        
-        sales_query = db.query(func.sum(Sale.amount)).filter(
-            Sale.owner_id == user_id,
-            Sale.date.between(start_date, end_date)
-        )
-            
-        expenses_query = db.query(func.sum(Expense.amount)).filter(
-            Expense.owner_id == user_id,
-            Expense.date.between(start_date, end_date)
-        )
-        
-        total_income = sales_query.scalar() or 0.0
-        total_expenses = expenses_query.scalar() or 0.0
-        
-        net_profit = total_income - total_expenses
-        labels.append(start_date.strftime("%b"))  # 'Jan', 'Feb', etc.
-        income_data.append(total_income)
-        expense_data.append(total_expenses)
-        profit_data.append(net_profit)
+
+    # Fill every month in the range, including months with no rows
+    for current_year in range(year, end_year + 1):
+        for month in range(1, 13):
+            total_income, total_expenses = totals_by_month.get((current_year, month), (0.0, 0.0))
+            net_profit = total_income - total_expenses
+
+            month_start = date(current_year, month, 1)
+            # 'Jan', 'Feb', etc. for a single year, 'Jan 2023' across years
+            labels.append(month_start.strftime("%b") if year == end_year else month_start.strftime("%b %Y"))
+            income_data.append(total_income)
+            expense_data.append(total_expenses)
+            profit_data.append(net_profit)
         
     return {
         "labels": labels,
@@ -89,43 +125,56 @@ def get_monthly_summary(db: Session,
         ]
     }
 
+# Year /analytics/monthly-summary reports when none is given
+DEFAULT_MONTHLY_SUMMARY_YEAR = 2001
+
+# Longest range (in weeks) the weekly summary will bucket in one request
+MAX_WEEKLY_BUCKETS = 260
+
+
+@cached_analytics
 def get_weekly_summary(db: Session, 
                        user_id: int,
                           start_date: datetime,
                           end_date: datetime | None) -> dict:
-    labels = []
-    income_data = []
-    expense_data = []
-    profit_data = []
-    
-    current_date = start_date
-    
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+
     # If end_date is not provided, set it to 6 days after start_date
     if not end_date:
-        end_date = current_date + timedelta(days=6)
+        end_date = start_date + timedelta(days=6)
 
     # Ensure start_date is not later than end_date
     if start_date > end_date:
         raise ValueError("Start date cannot be later than end date.")
-    
-    # Ensure current_date is not later than end_date
-    while current_date <= end_date:
-        week_start = current_date
-        # Calculate the end of the week (7 days later)
+
+    # The last week may run past end_date, as it always has
+    weeks = (end_date - start_date).days // 7 + 1
+    if weeks > MAX_WEEKLY_BUCKETS:
+        raise ValueError(f"Date range too long. The weekly summary covers at most {MAX_WEEKLY_BUCKETS} weeks.")
+
+    # Weeks are counted from start_date, not ISO weeks. The start date and week length
+    # are inlined rather than bound, as in _bucketed_series, so that the GROUP BY
+    # expression matches the selected one under server-side parameters (asyncpg).
+    week = cast(DailyRollup.date - literal_column(f"DATE '{start_date.isoformat()}'"), Integer) / literal_column("7")
+    totals_by_week = _rollup_totals(
+        db, user_id,
+        [week],
+        start_date, start_date + timedelta(weeks=weeks)
+    )
+
+    labels = []
+    income_data = []
+    expense_data = []
+    profit_data = []
+
+    for week in range(weeks):
+        week_start = start_date + timedelta(weeks=week)
         week_end = week_start + timedelta(days=6)
-        
-        # query sales and expenses for the week
-        sales_query = db.query(func.sum(Sale.amount)).filter(
-            Sale.owner_id == user_id,
-            Sale.date.between(week_start, week_end)  
-        )
-        expenses_query = db.query(func.sum(Expense.amount)).filter(
-            Expense.owner_id == user_id,
-            Expense.date.between(week_start, week_end)
-        )
 
-        total_income = sales_query.scalar() or 0.0
-        total_expenses = expenses_query.scalar() or 0.0
+        total_income, total_expenses = totals_by_week.get((week,), (0.0, 0.0))
         net_profit = total_income - total_expenses
         
         # Create chart-ready labels and data
@@ -135,9 +184,6 @@ def get_weekly_summary(db: Session,
         expense_data.append(total_expenses)
         profit_data.append(net_profit)
 
-        # set current_date to the next week
-        current_date = week_end + timedelta(days=1)
-
     return {
         "labels": labels,
         "datasets": [
@@ -147,9 +193,34 @@ def get_weekly_summary(db: Session,
         ]
     }
 
+@cached_analytics
 def get_top_selling_items(db: Session, user_id: int, start_date: datetime | None = None, 
     end_date: datetime | None = None, limit: int = 5, item_name: str | None = None) -> dict:
     
+    return _top_selling(db, user_id, start_date, end_date, limit, item_name)
+
+
+def _top_selling(db: Session, user_id: int, start_date: datetime | None, 
+    end_date: datetime | None, limit: int, item_name: str | None = None) -> dict:
+    # Without filters the answer is read off the maintained per-item totals;
+    # otherwise the user's sales are grouped. Both are exact.
+    if settings.top_selling_precomputed and not (start_date or end_date or item_name):
+        results = db.query(
+            ItemTotal.item,
+            ItemTotal.quantity.label("total_quantity"),
+            ItemTotal.revenue.label("total_revenue")
+        ).filter(
+            ItemTotal.owner_id == user_id,
+            ItemTotal.sales_count > 0
+        ).order_by(ItemTotal.quantity.desc(), ItemTotal.item).limit(limit).all()
+        return _top_selling_chart(results, "precomputed")
+
+    results = _top_selling_query(db, user_id, start_date, end_date, limit, item_name).all()
+    return _top_selling_chart(results, "exact")
+
+
+def _top_selling_query(db: Session, user_id: int, start_date: datetime | None, 
+    end_date: datetime | None, limit: int, item_name: str | None = None):
     filters = [Sale.owner_id == user_id]
 
     query = db.query(
@@ -163,12 +234,14 @@ def get_top_selling_items(db: Session, user_id: int, start_date: datetime | None
     if end_date:
         filters.append(Sale.date <= end_date)
     if item_name:
-        filters.append(Sale.item.ilike(f"%{item_name}%"))
+        filters.append(item_contains(Sale.item, item_name))
 
-    query = query.filter(*filters).group_by(Sale.item).order_by(func.sum(Sale.quantity).desc()).limit(limit)
+    return query.filter(*filters).group_by(Sale.item).order_by(
+        func.sum(Sale.quantity).desc(), Sale.item
+    ).limit(limit)
 
-    results = query.all()
-    
+
+def _top_selling_chart(results: list, mode: str) -> dict:
     # Create chart-ready data
     labels = [row.item for row in results]
     quantity_data = [row.total_quantity for row in results]
@@ -179,13 +252,21 @@ def get_top_selling_items(db: Session, user_id: int, start_date: datetime | None
         "datasets": [
             {"label": "Quantity Sold", "data": quantity_data},
             {"label": "Revenue (N)", "data": revenue_data},
-        ]
+        ],
+        # "precomputed" (maintained item totals) or "exact" (grouped from sales)
+        "mode": mode
     }
     
+@cached_analytics
 def get_expense_breakdown(db: Session, user_id: int, 
                           start_date: datetime | None = None, 
                           end_date: datetime | None = None) -> dict:
-    
+    return _expense_breakdown_chart(_expense_breakdown_query(db, user_id, start_date, end_date).all())
+
+
+def _expense_breakdown_query(db: Session, user_id: int, 
+                             start_date: datetime | None, 
+                             end_date: datetime | None):
     # Query to get total expenses by category
     query = db.query(
         Expense.category,
@@ -201,14 +282,187 @@ def get_expense_breakdown(db: Session, user_id: int,
         query = query.filter(Expense.date <= end_date)
 
     # Group by category and order by total amount spent
-    query = query.group_by(Expense.category).order_by(func.sum(Expense.amount).desc())
+    return query.group_by(Expense.category).order_by(func.sum(Expense.amount).desc())
+
 
+def _expense_breakdown_chart(results: list) -> dict:
     return {    
-        "labels": [row.category for row in query.all()],
+        "labels": [row.category for row in results],
         "datasets": [
             {
                 "label": "Total Amount",
-                "data": [row.total_amount for row in query.all()]
+                "data": [row.total_amount for row in results]
             }
         ]
     }
+
+
+@cached_analytics
+def get_dashboard(db: Session, user_id: int, year: int,
+                  start_date: datetime | None = None,
+                  end_date: datetime | None = None,
+                  limit: int = 5) -> dict:
+    # Every dashboard chart from three statements, one per table (item totals stand in
+    # for sales when there are no dates). Each section has
+    # the same shape as its standalone endpoint with the same arguments.
+    # The year bounds are inlined rather than bound: `month` below is both selected and
+    # grouped by, and under server-side parameters (asyncpg) the two copies would
+    # otherwise get separate parameters and no longer match
+    in_year = and_(
+        DailyRollup.date >= literal_column(f"DATE '{date(year, 1, 1).isoformat()}'"),
+        DailyRollup.date < literal_column(f"DATE '{date(year + 1, 1, 1).isoformat()}'")
+    )
+    # The summary only filters when both ends are given, as get_financial_summary does
+    in_range = DailyRollup.date.between(start_date, end_date) if start_date and end_date else true()
+
+    # Rollup rows are bucketed by month when they fall in `year` (NULL otherwise),
+    # and each bucket sums the rows in the summary range and the rows in `year`
+    # separately, so one scan serves both the summary and the monthly chart
+    month = case((in_year, extract("month", DailyRollup.date)))
+    rows = db.query(
+        month.label("month"),
+        func.sum(case((in_range, DailyRollup.income), else_=0)).label("range_income"),
+        func.sum(case((in_range, DailyRollup.expenses), else_=0)).label("range_expenses"),
+        func.sum(case((in_year, DailyRollup.income), else_=0)).label("income"),
+        func.sum(case((in_year, DailyRollup.expenses), else_=0)).label("expenses")
+    ).filter(
+        DailyRollup.owner_id == user_id,
+        or_(in_year, in_range)
+    ).group_by(month).all()
+
+    totals_by_month = {
+        (year, int(row.month)): (float(row.income or 0.0), float(row.expenses or 0.0))
+        for row in rows if row.month is not None
+    }
+    total_income = sum(float(row.range_income or 0.0) for row in rows)
+    total_expenses = sum(float(row.range_expenses or 0.0) for row in rows)
+
+    return {
+        "summary": _summary_chart(total_income, total_expenses),
+        "monthly_summary": _monthly_chart(year, year, totals_by_month),
+        "top_selling": _top_selling(db, user_id, start_date, end_date, limit),
+        "expense_breakdown": _expense_breakdown_chart(_expense_breakdown_query(db, user_id, start_date, end_date).all()),
+    }
+
+
+
+# Granularity -> (date_trunc unit, generate_series step)
+TIMESERIES_GRANULARITIES = {
+    "day": ("day", "1 day"),
+    "week": ("week", "1 week"),
+    "month": ("month", "1 month"),
+    "quarter": ("quarter", "3 months"),
+    "year": ("year", "1 year"),
+}
+
+# Most buckets one time series may have; enough for ten years of days
+MAX_TIMESERIES_POINTS = 4000
+
+
+def _timeseries_points(granularity: str, start_date: date, end_date: date) -> int:
+    # Number of buckets between the buckets holding start_date and end_date
+    if granularity == "day":
+        return (end_date - start_date).days + 1
+    if granularity == "week":
+        # Weeks start on Monday, as date_trunc('week') does
+        first_monday = start_date - timedelta(days=start_date.weekday())
+        last_monday = end_date - timedelta(days=end_date.weekday())
+        return (last_monday - first_monday).days // 7 + 1
+    if granularity == "month":
+        return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+    if granularity == "quarter":
+        return (end_date.year - start_date.year) * 4 + (end_date.month - 1) // 3 - (start_date.month - 1) // 3 + 1
+    return end_date.year - start_date.year + 1
+
+
+def _timeseries_label(granularity: str, bucket: datetime) -> str:
+    if granularity in ("day", "week"):
+        return bucket.strftime("%Y-%m-%d")
+    if granularity == "month":
+        return bucket.strftime("%b %Y")
+    if granularity == "quarter":
+        return f"Q{(bucket.month - 1) // 3 + 1} {bucket.year}"
+    return str(bucket.year)
+
+
+def _bucketed_series(db: Session, granularity: str, start_date: date, end_date: date,
+                     date_column, value_columns: list, filters: list) -> list:
+    # One statement: the rows are summed per bucket and left-joined onto a
+    # generate_series of every bucket in the range, so empty buckets come back as 0.
+    # The unit is inlined rather than bound so that the GROUP BY expression matches
+    # the selected one under server-side parameters (asyncpg).
+    unit, step = TIMESERIES_GRANULARITIES[granularity]
+    
+    def trunc(value):
+        return func.date_trunc(literal_column(f"'{unit}'"), cast(value, DateTime))
+
+    totals = db.query(
+        trunc(date_column).label("bucket"),
+        *[func.sum(column).label(f"value_{i}") for i, column in enumerate(value_columns)]
+    ).filter(
+        *filters,
+        date_column >= start_date,
+        date_column <= end_date
+    ).group_by(trunc(date_column)).subquery()
+
+    series = func.generate_series(
+        trunc(start_date), trunc(end_date), literal_column(f"interval '{step}'")
+    ).table_valued("bucket").render_derived(name="series")
+
+    return db.query(
+        series.c.bucket,
+        *[func.coalesce(totals.c[f"value_{i}"], 0) for i in range(len(value_columns))]
+    ).select_from(series).outerjoin(
+        totals, totals.c.bucket == series.c.bucket
+    ).order_by(series.c.bucket).all()
+
+
+@cached_analytics
+def get_timeseries(db: Session, user_id: int, granularity: str,
+                   start_date: datetime, end_date: datetime,
+                   item: str | None = None, category: str | None = None) -> dict:
+    if granularity not in TIMESERIES_GRANULARITIES:
+        raise ValueError(f"Granularity must be one of: {', '.join(TIMESERIES_GRANULARITIES)}.")
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+    if start_date > end_date:
+        raise ValueError("Start date cannot be later than end date.")
+    if _timeseries_points(granularity, start_date, end_date) > MAX_TIMESERIES_POINTS:
+        raise ValueError(f"Date range too long. A time series has at most {MAX_TIMESERIES_POINTS} points.")
+
+    rollup_filters = [DailyRollup.owner_id == user_id]
+    if not item and not category:
+        # Unfiltered series come from the daily rollup in a single statement
+        rows = _bucketed_series(db, granularity, start_date, end_date, DailyRollup.date,
+                                [DailyRollup.income, DailyRollup.expenses], rollup_filters)
+        buckets = [row[0] for row in rows]
+        income_data = [float(row[1]) for row in rows]
+        expense_data = [float(row[2]) for row in rows]
+    else:
+        # A filter only applies to its own table; the other side still uses the rollup
+        if item:
+            income_rows = _bucketed_series(db, granularity, start_date, end_date, Sale.date, [Sale.amount],
+                                           [Sale.owner_id == user_id, item_contains(Sale.item, item)])
+        else:
+            income_rows = _bucketed_series(db, granularity, start_date, end_date, DailyRollup.date,
+                                           [DailyRollup.income], rollup_filters)
+        if category:
+            expense_rows = _bucketed_series(db, granularity, start_date, end_date, Expense.date, [Expense.amount],
+                                            [Expense.owner_id == user_id, Expense.category == category])
+        else:
+            expense_rows = _bucketed_series(db, granularity, start_date, end_date, DailyRollup.date,
+                                            [DailyRollup.expenses], rollup_filters)
+        buckets = [row[0] for row in income_rows]
+        income_data = [float(row[1]) for row in income_rows]
+        expense_data = [float(row[1]) for row in expense_rows]
+
+    return {
+        "labels": [_timeseries_label(granularity, bucket) for bucket in buckets],
+        "datasets": [
+            {"label": "Income", "data": income_data},
+            {"label": "Expenses", "data": expense_data},
+            {"label": "Net Profit", "data": [income - expenses for income, expenses in zip(income_data, expense_data)]},
+        ]
+    }
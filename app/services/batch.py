@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import weakref
+from datetime import date, datetime
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.runner import run_db_isolated
+from app.schemas.analytics import WidgetSpec
+from app.services.analytics import (DEFAULT_MONTHLY_SUMMARY_YEAR, get_dashboard, get_expense_breakdown, get_financial_summary,
+                                    get_monthly_summary, get_timeseries, get_top_selling_items,
+                                    get_weekly_summary)
+
+logger = logging.getLogger(__name__)
+
+# Semaphore bounding widget sessions across every batch, one per event loop
+# (a worker runs one loop; tests may run several)
+_session_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def widget_call(spec: WidgetSpec) -> tuple:
+    # The analytics function and its arguments (after db and user_id) for one widget,
+    # with the same defaults as the standalone endpoint
+    if spec.type == "summary":
+        return get_financial_summary, (spec.start_date, spec.end_date)
+    if spec.type == "monthly_summary":
+        return get_monthly_summary, (spec.year or DEFAULT_MONTHLY_SUMMARY_YEAR, spec.end_year)
+    if spec.type == "weekly_summary":
+        if not spec.start_date:
+            raise ValueError("Start date is required.")
+        return get_weekly_summary, (spec.start_date, spec.end_date)
+    if spec.type == "top_selling":
+        return get_top_selling_items, (spec.start_date, spec.end_date, spec.limit, spec.item)
+    if spec.type == "expense_breakdown":
+        return get_expense_breakdown, (spec.start_date, spec.end_date)
+    if spec.type == "timeseries":
+        if not spec.start_date:
+            raise ValueError("Start date is required.")
+        end_date = spec.end_date or datetime.combine(date.today(), datetime.min.time())
+        return get_timeseries, (spec.granularity, spec.start_date, end_date, spec.item, spec.category)
+    return get_dashboard, (spec.year or date.today().year, spec.start_date, spec.end_date, spec.limit)
+
+def session_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _session_slots.get(loop)
+    if slots is None:
+        slots = _session_slots[loop] = asyncio.Semaphore(settings.analytics_batch_max_sessions)
+    return slots
+
+async def run_widget(session_factory: sessionmaker, user_id: int, spec: WidgetSpec,
+                     limiter: asyncio.Semaphore, data_version: int | None = None) -> dict:
+    # A failing widget is reported in its own result and does not fail the batch
+    try:
+        fn, args = widget_call(spec)
+        # The batch's own limit first, then the worker-wide one on pooled sessions
+        async with limiter, session_slots():
+            data = await run_db_isolated(session_factory, fn, user_id, *args, data_version=data_version)
+    except ValueError as e:
+        return {"status": 400, "error": str(e)}
+    except Exception:
+        logger.exception("Analytics widget %s failed", spec.type)
+        return {"status": 500, "error": "Internal error while computing this widget."}
+    return {"status": 200, "data": data}
+
+async def run_widgets(session_factory: sessionmaker, user_id: int, specs: list, concurrency: int,
+                      data_version: int | None = None) -> list:
+    # Widgets run concurrently, each on its own session, at most `concurrency` at a
+    # time; results come back in request order. `data_version` is the request's,
+    # for the analytics cache keys (see cached_analytics).
+    limiter = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *(run_widget(session_factory, user_id, spec, limiter, data_version) for spec in specs)
+    )
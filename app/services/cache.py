@@ -0,0 +1,57 @@
+import functools
+import inspect
+from datetime import datetime, time
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.crud.user import get_data_version
+
+analytics_cache = TTLCache(settings.analytics_cache_max_entries, settings.analytics_cache_ttl_seconds)
+# Authentication: access token -> user id, and user id -> detached User
+token_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+principal_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+# Users who wrote within the read-your-writes window; their reads skip the replica
+recent_writes = TTLCache(settings.auth_cache_max_entries, settings.replica_read_your_writes_seconds)
+
+
+def _normalize(value):
+    # Midnight datetimes and plain dates select the same rows, so share an entry
+    if isinstance(value, datetime) and value.time() == time.min and value.tzinfo is None:
+        return value.date()
+    return value
+
+def cached_analytics(fn):
+    # Cache an analytics function `fn(db, user_id, ...)` per user, normalized arguments
+    # and the user's data_version. Every write bumps the version, so an entry can only
+    # be served while the data it was computed from is current, whichever worker made
+    # the write. Routes pass the request's `data_version` (the one its ETag and replica
+    # check used) so that a hit costs no query; without it, it is read through `db`.
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(db, user_id: int, *args, data_version: int | None = None, **kwargs):
+        bound = signature.bind(db, user_id, *args, **kwargs)
+        bound.apply_defaults()
+        if data_version is None:
+            data_version = get_data_version(db, user_id)
+        key = (fn.__name__, user_id, data_version) + tuple(
+            (name, _normalize(value)) for name, value in bound.arguments.items()
+            if name not in ("db", "user_id")
+        )
+
+        result = analytics_cache.get(key)
+        if result is MISSING:
+            version = analytics_cache.tag_version(user_id)
+            result = fn(db, user_id, *args, **kwargs)
+            analytics_cache.set(key, result, tag=user_id, tag_version=version)
+        return result
+
+    return wrapper
+
+def invalidate_user_caches(user_id: int) -> None:
+    # Called after every committed sale or expense write. Cached analytics are
+    # keyed by data_version and so already unreachable; this frees them early.
+    # The cached principal goes too, since it carries the data_version the write
+    # just bumped.
+    analytics_cache.invalidate_tag(user_id)
+    principal_cache.invalidate_tag(user_id)
+    recent_writes.set(user_id, True)
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import TYPE_CHECKING, AsyncIterator, Iterator
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app.db.runner import is_async
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def encode_header(stmt: Select, export_format: str) -> str:
+    if export_format == "csv":
+        return _csv_text([[column.name for column in stmt.selected_columns]])
+    return ""
+
+def encode_batch(batch: list, export_format: str) -> str:
+    if export_format == "csv":
+        return _csv_text(batch)
+    return "".join(json.dumps(dict(row._mapping), default=_json_default) + "\n" for row in batch)
+
+def stream_batches(bind: Engine, stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    # Server-side cursor on a connection of its own: rows arrive batch_size at a time
+    # as plain rows (no ORM objects, no identity map), so memory stays flat
+    with bind.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=batch_size).execute(stmt)
+        for batch in result.partitions(batch_size):
+            yield batch
+
+async def stream_batches_async(bind: "AsyncEngine", stmt: Select, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[list]:
+    async with bind.connect() as connection:
+        result = await connection.stream(stmt)
+        async for batch in result.partitions(batch_size):
+            yield batch
+
+def _iter_export(bind: Engine, stmt: Select, export_format: str) -> Iterator[str]:
+    yield encode_header(stmt, export_format)
+    for batch in stream_batches(bind, stmt):
+        yield encode_batch(batch, export_format)
+
+async def _aiter_export(bind: "AsyncEngine", stmt: Select, export_format: str) -> AsyncIterator[str]:
+    yield encode_header(stmt, export_format)
+    async for batch in stream_batches_async(bind, stmt):
+        yield encode_batch(batch, export_format)
+
+def export_response(db: "Session | AsyncSession", stmt: Select, export_format: str, filename: str) -> StreamingResponse:
+    # The request's session is closed before the body is sent, hence its engine
+    # rather than the session: the stream opens (and closes) its own connection
+    if is_async(db):
+        rows = _aiter_export(db.bind, stmt, export_format)
+    else:
+        rows = _iter_export(db.get_bind(), stmt, export_format)
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
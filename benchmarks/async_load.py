@@ -0,0 +1,62 @@
+"""Throughput of an analytics route at high concurrency.
+
+Usage: python -m benchmarks.async_load URL USER_ID [concurrency] [seconds]
+
+Start the server once with DATABASE_ASYNC=false and once with
+DATABASE_ASYNC=true (same worker count), run this against each, and
+compare. A token for USER_ID is minted with the configured SECRET_KEY.
+
+    uvicorn app.main:app --workers 1 &
+    python -m benchmarks.async_load http://localhost:8000 1 200 20
+"""
+import asyncio
+import statistics
+import sys
+import time
+import httpx
+from app.core.token import create_access_token
+
+PATHS = [
+    "/api/v1/analytics/summary",
+    "/api/v1/analytics/monthly-summary?year=2024",
+    "/api/v1/analytics/top-selling",
+    "/api/v1/sales/?limit=50",
+]
+
+
+async def worker(client: httpx.AsyncClient, deadline: float, latencies: list, errors: list, offset: int) -> None:
+    i = offset
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+async def main() -> None:
+    base_url, user_id = sys.argv[1], int(sys.argv[2])
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 15
+    
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': user_id})}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, errors = [], []
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(worker(client, deadline, latencies, errors, n) for n in range(concurrency)))
+    
+    latencies.sort()
+    print(f"concurrency={concurrency} duration={seconds}s requests={len(latencies)} errors={len(errors)}")
+    print(f"  throughput: {len(latencies) / seconds:.1f} req/s")
+    print(f"  latency p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95)] * 1000:.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Per-row vs bulk sale inserts against the configured database.
+
+Usage: python -m benchmarks.bulk_insert [rows]
+
+Creates a throwaway user, inserts `rows` sales through create_sale (one
+add/commit/refresh per row) and through create_sales_bulk, prints the
+throughput of each, then deletes the user and everything it owns.
+"""
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from app.crud.sales import create_sale, create_sales_bulk
+from app.db.session import get_database
+from app.models.rollup import DailyRollup
+from app.models.sales import Sale
+from app.models.user import User
+from app.schemas.sales import SaleCreate
+
+
+def make_sales(count: int) -> list[SaleCreate]:
+    start = datetime(2024, 1, 1)
+    return [
+        SaleCreate(item=f"Item {i % 50}", quantity=1 + i % 5, amount=10.0 + i % 100, date=start + timedelta(days=i % 365))
+        for i in range(count)
+    ]
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    db = get_database().SessionLocal()
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", password="x")
+    db.add(user)
+    db.commit()
+    try:
+        sales = make_sales(rows)
+        
+        started = time.perf_counter()
+        for sale in sales:
+            create_sale(db, sale, user.id)
+        per_row = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        create_sales_bulk(db, sales, user.id)
+        bulk = time.perf_counter() - started
+        
+        print(f"{rows} sales")
+        print(f"  per-row: {per_row:8.3f}s  {rows / per_row:10.0f} rows/s")
+        print(f"  bulk:    {bulk:8.3f}s  {rows / bulk:10.0f} rows/s  ({per_row / bulk:.1f}x)")
+    finally:
+        db.rollback()
+        db.query(Sale).filter(Sale.owner_id == user.id).delete()
+        db.query(DailyRollup).filter(DailyRollup.owner_id == user.id).delete()
+        db.query(User).filter(User.id == user.id).delete()
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
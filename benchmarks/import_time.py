@@ -0,0 +1,56 @@
+"""Cost of importing the app and of building it.
+
+Usage: python -m benchmarks.import_time [repeats]
+
+Imports app.main in fresh interpreters under -X importtime and reports the
+median total, the slowest app.* modules (cumulative, so a module includes
+what it imports), and the time create_app() takes once everything is
+imported. Neither step needs a database: the engines are only built when the
+app starts serving.
+"""
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def import_times() -> tuple[int, dict[str, int]]:
+    # Total microseconds and module -> cumulative microseconds, from one fresh interpreter
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    )
+    total, times = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # Nested imports are indented under the module that triggered them
+        if not module[1:].startswith(" "):
+            total += int(cumulative)
+        times[module.strip()] = int(cumulative)
+    return total, times
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    runs = [import_times() for _ in range(repeats)]
+    print(f"import app.main: {statistics.median(total for total, _ in runs) / 1000:.1f} ms (median of {repeats})")
+
+    by_module = defaultdict(list)
+    for _, run in runs:
+        for module, us in run.items():
+            if module == "app" or module.startswith("app."):
+                by_module[module].append(us)
+    slowest = sorted(by_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:10]
+    for module, timings in slowest:
+        print(f"  {module:<40} {statistics.median(timings) / 1000:8.1f} ms")
+
+    from app.main import create_app
+    started = time.perf_counter()
+    create_app()
+    print(f"create_app(): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Item filters and item search with and without the pg_trgm indexes.
+
+Usage: python -m benchmarks.item_search [rows] [repeats]
+
+Creates a throwaway user owning `rows` sales (default 1,000,000, generated
+server-side) and times the item-filtered sales list, the item-filtered
+top-selling query and the ranked item search. Each query is timed twice:
+once as is, and once inside a transaction that drops ix_sales_item_trgm and
+is rolled back afterwards. The drop holds an exclusive lock on sales until
+the rollback, so only run this against a benchmark database. The user and
+its sales are deleted at the end.
+"""
+import statistics
+import sys
+import time
+import uuid
+from sqlalchemy import text
+from app.crud.sales import get_sales
+from app.crud.search import search_items
+from app.db.session import get_database
+from app.models.sales import Sale
+from app.models.user import User
+from app.services.analytics import get_top_selling_items
+
+DISTINCT_ITEMS = 50000
+
+
+def timed(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def run_queries(db, user_id: int, term: str, repeats: int) -> dict:
+    # The undecorated function, so the analytics cache does not answer the repeats
+    top_selling = get_top_selling_items.__wrapped__
+    return {
+        "sales list ?item_name": timed(lambda: get_sales(db, user_id, term, 100), repeats),
+        "top-selling ?item": timed(lambda: top_selling(db, user_id, None, None, 5, term), repeats),
+        "item search": timed(lambda: search_items(db, user_id, term, 20), repeats),
+    }
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    db = get_database().SessionLocal()
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", password="x")
+    db.add(user)
+    db.commit()
+    try:
+        started = time.perf_counter()
+        db.execute(text("""
+            INSERT INTO sales (item, amount, quantity, date, owner_id)
+            SELECT 'product-' || substr(md5((i % :items)::text), 1, 12), 10 + i % 100, 1 + i % 5,
+                   DATE '2020-01-01' + i % 1500, :owner_id
+            FROM generate_series(1, :rows) AS i
+        """), {"items": DISTINCT_ITEMS, "owner_id": user.id, "rows": rows})
+        db.commit()
+        db.execute(text("ANALYZE sales"))
+        print(f"inserted {rows} sales in {time.perf_counter() - started:.1f}s")
+
+        # A substring of one item name, so a handful of the distinct items match
+        term = db.execute(text("SELECT substr(md5('4242'), 3, 6)")).scalar()
+
+        with_index = run_queries(db, user.id, term, repeats)
+        db.rollback()
+        db.execute(text("DROP INDEX ix_sales_item_trgm"))
+        without_index = run_queries(db, user.id, term, repeats)
+        db.rollback()
+
+        print(f"median of {repeats} runs, search term {term!r}")
+        for name in with_index:
+            print(f"  {name:24} trigram index: {with_index[name]:8.1f}ms   without: {without_index[name]:8.1f}ms")
+    finally:
+        db.rollback()
+        db.query(Sale).filter(Sale.owner_id == user.id).delete(synchronize_session=False)
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
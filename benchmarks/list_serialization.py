@@ -0,0 +1,92 @@
+"""Sales list serialization: ORM objects through SaleResponse vs column rows.
+
+Usage: python -m benchmarks.list_serialization [rows] [repeats]
+
+Creates a throwaway user owning `rows` sales (default 1,000) and builds the
+JSON body of one page of `GET /sales/?limit=rows` both ways:
+
+  orm   get_sales, then SaleResponse validation with from_attributes and a
+        dump to JSON types, as FastAPI does for a response_model, then rendering
+  rows  get_sale_rows, rendered as is, as read_sales does now
+
+Each is timed end to end (query and serialization) and serialization alone,
+and reported as rows/sec. The user and its sales are deleted at the end.
+"""
+import statistics
+import sys
+import time
+import uuid
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from app.api.responses import NegotiatedResponse
+from app.crud.sales import get_sale_rows, get_sales
+from app.db.session import get_database
+from app.models.sales import Sale
+from app.models.user import User
+from app.schemas.sales import SaleResponse
+
+sale_responses = TypeAdapter(List[SaleResponse])
+
+
+def timed(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def orm_body(sales: list) -> bytes:
+    validated = sale_responses.validate_python(sales, from_attributes=True)
+    return NegotiatedResponse(sale_responses.dump_python(validated, mode="json")).body
+
+def rows_body(rows: list) -> bytes:
+    return NegotiatedResponse(rows).body
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    db = get_database().SessionLocal()
+    user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", password="x")
+    db.add(user)
+    db.commit()
+    try:
+        db.execute(text("""
+            INSERT INTO sales (item, amount, quantity, date, owner_id)
+            SELECT 'product-' || i % 500, 10 + i % 100, 1 + i % 5, DATE '2020-01-01' + i % 1500, :owner_id
+            FROM generate_series(1, :rows) AS i
+        """), {"owner_id": user.id, "rows": rows})
+        db.commit()
+
+        def orm_page() -> bytes:
+            # A fresh identity map each time, as every request gets its own session
+            db.expunge_all()
+            return orm_body(get_sales(db, user.id, None, rows))
+
+        def rows_page() -> bytes:
+            return rows_body(get_sale_rows(db, user.id, None, rows))
+
+        assert orm_page() == rows_page(), "the two paths must render the same JSON"
+        objects = get_sales(db, user.id, None, rows)
+        dicts = get_sale_rows(db, user.id, None, rows)
+        results = {
+            "orm   query + serialize": timed(orm_page, repeats),
+            "rows  query + serialize": timed(rows_page, repeats),
+            "orm   serialize only": timed(lambda: orm_body(objects), repeats),
+            "rows  serialize only": timed(lambda: rows_body(dicts), repeats),
+        }
+
+        print(f"median of {repeats} runs, {rows} rows per page")
+        for name, seconds in results.items():
+            print(f"  {name:24} {rows / seconds:12,.0f} rows/s  ({seconds * 1000:.1f}ms)")
+    finally:
+        db.rollback()
+        db.query(Sale).filter(Sale.owner_id == user.id).delete(synchronize_session=False)
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
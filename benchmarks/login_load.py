@@ -0,0 +1,93 @@
+"""Login throughput next to analytics latency under a mixed load.
+
+Usage: python -m benchmarks.login_load URL EMAIL PASSWORD [login_concurrency] [analytics_concurrency] [seconds]
+
+EMAIL/PASSWORD must belong to an existing user; analytics requests are made
+as that user. Run once with analytics traffic alone (login_concurrency=0)
+and once with a login burst, then compare the analytics percentiles. 429s
+from the password executor are counted separately from errors.
+
+    uvicorn app.main:app --workers 1 &
+    python -m benchmarks.login_load http://localhost:8000 me@example.com secret 50 50 20
+"""
+import asyncio
+import statistics
+import sys
+import time
+import httpx
+
+ANALYTICS_PATHS = [
+    "/api/v1/analytics/summary",
+    "/api/v1/analytics/monthly-summary?year=2024",
+    "/api/v1/analytics/top-selling",
+]
+
+
+async def login_worker(client: httpx.AsyncClient, deadline: float, credentials: dict, results: dict) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/api/v1/auth/login", data=credentials)
+        except httpx.HTTPError:
+            results["errors"] += 1
+            continue
+        if response.status_code == 200:
+            results["latencies"].append(time.perf_counter() - started)
+        elif response.status_code == 429:
+            results["rejected"] += 1
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+        else:
+            results["errors"] += 1
+
+async def analytics_worker(client: httpx.AsyncClient, deadline: float, headers: dict, results: dict, offset: int) -> None:
+    i = offset
+    while time.perf_counter() < deadline:
+        path = ANALYTICS_PATHS[i % len(ANALYTICS_PATHS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code >= 400:
+                results["errors"] += 1
+        except httpx.HTTPError:
+            results["errors"] += 1
+        results["latencies"].append(time.perf_counter() - started)
+
+def report(name: str, results: dict, seconds: float) -> None:
+    latencies = sorted(results["latencies"])
+    print(f"{name}: ok={len(latencies)} errors={results['errors']} rejected={results.get('rejected', 0)}")
+    if latencies:
+        print(f"  throughput: {len(latencies) / seconds:.1f} req/s")
+        print(f"  latency p50={statistics.median(latencies) * 1000:.1f}ms "
+              f"p95={latencies[int(len(latencies) * 0.95)] * 1000:.1f}ms "
+              f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+
+async def main() -> None:
+    base_url, email, password = sys.argv[1], sys.argv[2], sys.argv[3]
+    login_concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+    analytics_concurrency = int(sys.argv[5]) if len(sys.argv) > 5 else 50
+    seconds = float(sys.argv[6]) if len(sys.argv) > 6 else 15
+    credentials = {"username": email, "password": password}
+
+    concurrency = login_concurrency + analytics_concurrency
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        response = await client.post("/api/v1/auth/login", data=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        logins = {"latencies": [], "errors": 0, "rejected": 0}
+        analytics = {"latencies": [], "errors": 0}
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(login_worker(client, deadline, credentials, logins) for _ in range(login_concurrency)),
+            *(analytics_worker(client, deadline, headers, analytics, n) for n in range(analytics_concurrency)),
+        )
+
+    print(f"logins={login_concurrency} analytics={analytics_concurrency} duration={seconds}s")
+    report("login", logins, seconds)
+    report("analytics", analytics, seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
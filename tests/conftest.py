@@ -1,17 +1,20 @@
 from sqlalchemy.engine.url import URL
 from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.main import app
 from app.core.config import settings
-from app.api.deps import get_db
+from app.api.deps import get_db, get_session_factory
 from app.models.base import Base
 from app.models.sales import Sale
 from app.schemas.user import UserResponse
 from app.models.expense import Expense
 from app.core.token import create_access_token
+from app.crud.rollup import rebuild_rollups
+from app.db.metrics import track_statements
+from app.services.cache import analytics_cache, principal_cache, token_cache
 import pytest
 
 DATABASE_URL = URL.create(
@@ -23,13 +26,21 @@ DATABASE_URL = URL.create(
     database=f'{settings.database_names}_test'
 )
 engine = create_engine(DATABASE_URL)
+track_statements(engine, "test")
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
         
 @pytest.fixture
 def session():
+    # The database is rebuilt for every test, so nothing cached may survive either
+    analytics_cache.clear()
+    token_cache.clear()
+    principal_cache.clear()
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        # The item search indexes need pg_trgm (created by a migration in real databases)
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -46,6 +57,7 @@ def client(session):
         finally:
             session.close()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     yield TestClient(app)
     
         
@@ -99,6 +111,7 @@ def test_sales(session, setup_user):
     sale = list(map(create_sale_model, sales_data))
     session.add_all(sale)
     session.commit()
+    rebuild_rollups(session, setup_user["id"])
     return(session.query(Sale).all())
     
 @pytest.fixture    
@@ -126,6 +139,7 @@ def test_expenses(session, setup_user):
     expense = list(map(create_expense_model, expenses_data))
     session.add_all(expense)
     session.commit()
+    rebuild_rollups(session, setup_user["id"])
     return(session.query(Expense).all())
     
     
\ No newline at end of file
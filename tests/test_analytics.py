@@ -89,4 +89,126 @@ def test_get_expense_breakdown_with_invalid_dates(authorized_client):
     response = authorized_client.get("api/v1/analytics/expense-breakdown?start_date=invalid&end_date=invalid")
     assert response.status_code == 400
     assert response.json() == {"detail": "Invalid date format. Use ISO format (YYYY-MM-DD)."}
-    
\ No newline at end of file
+    
+def test_get_monthly_summary_totals(authorized_client, test_sales, test_expenses):
+    response = authorized_client.get("api/v1/analytics/monthly-summary?year=2023")
+    assert response.status_code == 200
+    summary = response.json()
+    october = summary["labels"].index("Oct")
+    income, expenses, profit = (dataset["data"] for dataset in summary["datasets"])
+    assert income[october] == 200.0
+    assert expenses[october] == 110.0
+    assert profit[october] == 90.0
+    assert sum(income) == 200.0
+
+def test_get_monthly_summary_multi_year(authorized_client, test_sales, test_expenses):
+    response = authorized_client.get("api/v1/analytics/monthly-summary?year=2022&end_year=2024")
+    assert response.status_code == 200
+    summary = response.json()
+    assert len(summary["labels"]) == 36
+    assert summary["labels"][0] == "Jan 2022"
+    assert summary["labels"][-1] == "Dec 2024"
+    assert all(len(dataset["data"]) == 36 for dataset in summary["datasets"])
+    assert summary["datasets"][0]["data"][summary["labels"].index("Oct 2023")] == 200.0
+
+def test_get_monthly_summary_invalid_year_range(authorized_client):
+    response = authorized_client.get("api/v1/analytics/monthly-summary?year=2024&end_year=2023")
+    assert response.status_code == 400
+
+def test_get_weekly_summary_totals(authorized_client, test_sales, test_expenses):
+    response = authorized_client.get("api/v1/analytics/weekly-summary?start_date=2023-09-24&end_date=2023-10-14")
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["labels"] == ["09/24-09/30", "10/01-10/07", "10/08-10/14"]
+    income, expenses, profit = (dataset["data"] for dataset in summary["datasets"])
+    assert income == [0.0, 200.0, 0.0]
+    assert expenses == [0.0, 110.0, 0.0]
+    assert profit == [0.0, 90.0, 0.0]
+
+def test_get_weekly_summary_range_too_long(authorized_client):
+    response = authorized_client.get("api/v1/analytics/weekly-summary?start_date=2000-01-01&end_date=2020-01-01")
+    assert response.status_code == 400
+
+def test_get_weekly_summary_reversed_dates(authorized_client):
+    response = authorized_client.get("api/v1/analytics/weekly-summary?start_date=2023-10-07&end_date=2023-10-01")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Start date cannot be later than end date."}
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "year=2023",
+        "year=2023&start_date=2023-10-01&end_date=2023-10-31&limit=1",
+        "year=2022&start_date=2023-10-02",
+    ]
+)
+def test_dashboard_matches_individual_endpoints(authorized_client, test_sales, test_expenses, query):
+    params = dict(pair.split("=") for pair in query.split("&"))
+    dates = "&".join(f"{key}={params[key]}" for key in ("start_date", "end_date") if key in params)
+    
+    response = authorized_client.get(f"api/v1/analytics/dashboard?{query}")
+    assert response.status_code == 200
+    dashboard = response.json()
+    
+    assert dashboard["summary"] == authorized_client.get(f"api/v1/analytics/summary?{dates}").json()
+    assert dashboard["monthly_summary"] == authorized_client.get(
+        f"api/v1/analytics/monthly-summary?year={params['year']}").json()
+    assert dashboard["top_selling"] == authorized_client.get(
+        f"api/v1/analytics/top-selling?{dates}&limit={params.get('limit', 5)}").json()
+    assert dashboard["expense_breakdown"] == authorized_client.get(
+        f"api/v1/analytics/expense-breakdown?{dates}").json()
+
+def test_get_timeseries_daily_fills_gaps(authorized_client, test_sales, test_expenses):
+    response = authorized_client.get(
+        "api/v1/analytics/timeseries?granularity=day&start_date=2023-09-30&end_date=2023-10-03")
+    assert response.status_code == 200
+    series = response.json()
+    assert series["labels"] == ["2023-09-30", "2023-10-01", "2023-10-02", "2023-10-03"]
+    income, expenses, profit = (dataset["data"] for dataset in series["datasets"])
+    assert income == [0.0, 50.0, 150.0, 0.0]
+    assert expenses == [0.0, 30.0, 80.0, 0.0]
+    assert profit == [0.0, 20.0, 70.0, 0.0]
+
+def test_get_timeseries_monthly_matches_monthly_summary(authorized_client, test_sales, test_expenses):
+    series = authorized_client.get(
+        "api/v1/analytics/timeseries?granularity=month&start_date=2023-01-01&end_date=2023-12-31").json()
+    monthly = authorized_client.get("api/v1/analytics/monthly-summary?year=2023").json()
+    assert series["labels"][0] == "Jan 2023"
+    assert series["datasets"] == monthly["datasets"]
+
+def test_get_timeseries_quarter_and_year_labels(authorized_client, test_sales):
+    quarters = authorized_client.get(
+        "api/v1/analytics/timeseries?granularity=quarter&start_date=2023-05-01&end_date=2024-01-01").json()
+    assert quarters["labels"] == ["Q2 2023", "Q3 2023", "Q4 2023", "Q1 2024"]
+    assert quarters["datasets"][0]["data"] == [0.0, 0.0, 200.0, 0.0]
+    
+    years = authorized_client.get(
+        "api/v1/analytics/timeseries?granularity=year&start_date=2022-01-01&end_date=2023-12-31").json()
+    assert years["labels"] == ["2022", "2023"]
+
+def test_get_timeseries_filters(authorized_client, test_sales, test_expenses):
+    response = authorized_client.get(
+        "api/v1/analytics/timeseries?granularity=month&start_date=2023-10-01&end_date=2023-10-31"
+        "&item=Item 2&category=Utilities")
+    assert response.status_code == 200
+    income, expenses, _ = (dataset["data"] for dataset in response.json()["datasets"])
+    assert income == [150.0]
+    assert expenses == [30.0]
+
+def test_get_timeseries_invalid_requests(authorized_client):
+    url = "api/v1/analytics/timeseries"
+    assert authorized_client.get(f"{url}?granularity=hour&start_date=2023-10-01").status_code == 422
+    assert authorized_client.get(f"{url}?granularity=day").status_code == 422
+    assert authorized_client.get(
+        f"{url}?granularity=day&start_date=2000-01-01&end_date=2020-01-01").status_code == 400
+    assert authorized_client.get(
+        f"{url}?granularity=day&start_date=2023-10-07&end_date=2023-10-01").status_code == 400
+
+def test_top_selling_mode(authorized_client, test_sales):
+    precomputed = authorized_client.get("api/v1/analytics/top-selling").json()
+    exact = authorized_client.get("api/v1/analytics/top-selling?start_date=2023-01-01").json()
+    
+    assert precomputed["mode"] == "precomputed"
+    assert exact["mode"] == "exact"
+    assert precomputed["labels"] == exact["labels"] == ["Item 2", "Item 1"]
+    assert precomputed["datasets"] == exact["datasets"]
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.schemas.analytics import WidgetSpec
+from app.services import batch
+from app.services.analytics import DEFAULT_MONTHLY_SUMMARY_YEAR
+
+
+def test_batch_returns_widgets_in_order(authorized_client, test_sales, test_expenses):
+    widgets = [
+        {"type": "summary", "start_date": "2023-10-01", "end_date": "2023-10-31"},
+        {"type": "weekly_summary"},
+        {"type": "monthly_summary", "year": 2023},
+        {"type": "expense_breakdown"},
+    ]
+    response = authorized_client.post("api/v1/analytics/batch", json={"widgets": widgets})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    
+    assert [result["status"] for result in results] == [200, 400, 200, 200]
+    assert results[0]["data"] == authorized_client.get(
+        "api/v1/analytics/summary?start_date=2023-10-01&end_date=2023-10-31").json()
+    assert results[1] == {"status": 400, "data": None, "error": "Start date is required."}
+    assert results[2]["data"] == authorized_client.get("api/v1/analytics/monthly-summary?year=2023").json()
+    assert results[3]["data"]["labels"] == ["Office Supplies", "Utilities"]
+
+def test_batch_rejects_empty_and_unknown_widgets(authorized_client):
+    assert authorized_client.post("api/v1/analytics/batch", json={"widgets": []}).status_code == 422
+    assert authorized_client.post("api/v1/analytics/batch", json={"widgets": [{"type": "nope"}]}).status_code == 422
+
+def test_widget_defaults_match_standalone_endpoints():
+    fn, args = batch.widget_call(WidgetSpec(type="monthly_summary"))
+    assert args == (DEFAULT_MONTHLY_SUMMARY_YEAR, None)
+
+def test_widgets_run_concurrently(monkeypatch):
+    def slow_widget(db, user_id, data_version=None):
+        time.sleep(0.2)
+        return {"user_id": user_id}
+    monkeypatch.setattr(batch, "widget_call", lambda spec: (slow_widget, ()))
+    specs = [WidgetSpec(type="summary") for _ in range(4)]
+    
+    started = time.perf_counter()
+    results = asyncio.run(batch.run_widgets(sessionmaker(), 1, specs, concurrency=4))
+    
+    assert time.perf_counter() - started < 0.6
+    assert results == [{"status": 200, "data": {"user_id": 1}}] * 4
+
+def test_widget_sessions_are_bounded_across_batches(monkeypatch):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    def slow_widget(db, user_id, data_version=None):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return {}
+    monkeypatch.setattr(batch, "widget_call", lambda spec: (slow_widget, ()))
+    monkeypatch.setattr(settings, "analytics_batch_max_sessions", 3)
+    specs = [WidgetSpec(type="summary") for _ in range(4)]
+
+    async def two_batches():
+        return await asyncio.gather(*(batch.run_widgets(sessionmaker(), 1, specs, concurrency=4) for _ in range(2)))
+
+    assert all(result["status"] == 200 for results in asyncio.run(two_batches()) for result in results)
+    assert peak == 3
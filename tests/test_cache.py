@@ -0,0 +1,139 @@
+import time
+from datetime import date
+from decimal import Decimal
+from jose import jwt
+from sqlalchemy import event
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.crud.rollup import apply_rollup_delta
+from app.crud.user import bump_data_version
+from app.models.sales import Sale
+from app.services.cache import analytics_cache, principal_cache, token_cache
+from tests.conftest import engine
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    
+    assert cache.get("a") is MISSING
+    assert cache.expirations == 1
+
+def test_ttl_cache_invalidates_by_tag():
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1, tag=1)
+    cache.set("b", 2, tag=1)
+    cache.set("c", 3, tag=2)
+    cache.invalidate_tag(1)
+    
+    assert cache.get("a") is MISSING
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+    assert cache.invalidations == 2
+
+def test_ttl_cache_drops_values_computed_before_invalidation():
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    version = cache.tag_version(1)
+    cache.invalidate_tag(1)
+    cache.set("a", 1, tag=1, tag_version=version)
+    
+    assert cache.get("a") is MISSING
+
+def test_analytics_are_cached_per_user(authorized_client, test_sales, test_expenses):
+    url = "api/v1/analytics/summary?start_date=2023-10-01&end_date=2023-10-31"
+    first = authorized_client.get(url)
+    hits = analytics_cache.hits
+    second = authorized_client.get(url)
+    
+    assert first.json() == second.json()
+    assert analytics_cache.hits == hits + 1
+
+def test_sale_write_invalidates_cached_analytics(authorized_client, test_sales, test_expenses):
+    url = "api/v1/analytics/summary?start_date=2023-10-01&end_date=2023-10-31"
+    assert authorized_client.get(url).json()["datasets"][0]["data"][0] == 200.0
+    
+    sale_data = {"item": "Item 3", "amount": 25.0, "quantity": 1, "date": "2023-10-03"}
+    assert authorized_client.post("api/v1/sales/", json=sale_data).status_code == 201
+    
+    assert authorized_client.get(url).json()["datasets"][0]["data"][0] == 225.0
+
+def test_write_through_another_worker_bypasses_cached_analytics(authorized_client, session, test_sales, test_expenses):
+    url = "api/v1/analytics/summary?start_date=2023-10-01&end_date=2023-10-31"
+    assert authorized_client.get(url).json()["datasets"][0]["data"][0] == 200.0
+
+    # Another worker's write: the rows and data_version change, but nothing in
+    # this process is invalidated
+    owner_id = test_sales[0].owner_id
+    session.add(Sale(item="Item 3", amount=25.0, quantity=1, date=date(2023, 10, 3), owner_id=owner_id))
+    apply_rollup_delta(session, owner_id, date(2023, 10, 3), income=Decimal(25), quantity=1, sales_count=1)
+    bump_data_version(session, owner_id)
+    session.commit()
+
+    assert authorized_client.get(url).json()["datasets"][0]["data"][0] == 225.0
+
+def test_cached_analytics_hit_reads_data_version_once(authorized_client, test_sales, test_expenses):
+    url = "api/v1/analytics/summary?start_date=2023-10-01&end_date=2023-10-31"
+    assert authorized_client.get(url).status_code == 200
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert authorized_client.get(url).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # The ETag's data_version lookup also keys the cache; nothing else is queried
+    assert len(statements) == 1
+    assert "data_version" in statements[0]
+
+def test_cache_stats_endpoint(client, monkeypatch):
+    assert client.get("api/v1/internal/cache-stats").status_code == 404
+    
+    monkeypatch.setattr(settings, "internal_api_token", "secret")
+    assert client.get("api/v1/internal/cache-stats").status_code == 403
+    
+    response = client.get("api/v1/internal/cache-stats", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= response.json()["analytics"].keys()
+
+def test_authenticated_requests_skip_user_lookup(authorized_client, test_sales):
+    assert authorized_client.get("api/v1/sales/").status_code == 200
+    
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert authorized_client.get("api/v1/sales/").status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    
+    # Only the ETag's data_version is read, never the whole user
+    assert statements
+    assert not [statement for statement in statements if "users.password" in statement]
+    assert token_cache.hits >= 1
+    assert principal_cache.hits >= 1
+
+def test_expired_token_is_not_cached(client, setup_user):
+    expired = jwt.encode(
+        {"user_id": setup_user["id"], "exp": int(time.time()) - 10},
+        settings.secret_key,
+        algorithm=settings.algorithm
+    )
+    response = client.get("api/v1/sales/", headers={"Authorization": f"Bearer {expired}"})
+    
+    assert response.status_code == 401
+    assert token_cache.stats()["entries"] == 0
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.cache import principal_cache
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "api/v1/sales/",
+        "api/v1/expenses/",
+        "api/v1/analytics/summary",
+        "api/v1/analytics/monthly-summary?year=2023",
+        "api/v1/analytics/weekly-summary?start_date=2023-10-01",
+        "api/v1/analytics/top-selling",
+        "api/v1/analytics/expense-breakdown",
+    ]
+)
+def test_matching_etag_returns_not_modified(authorized_client, test_sales, test_expenses, url):
+    response = authorized_client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    response = authorized_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+def test_etag_depends_on_query_parameters(authorized_client, test_sales):
+    first = authorized_client.get("api/v1/analytics/monthly-summary?year=2023")
+    second = authorized_client.get("api/v1/analytics/monthly-summary?year=2022")
+    assert first.headers["ETag"] != second.headers["ETag"]
+
+def test_write_changes_etag(authorized_client, test_sales):
+    response = authorized_client.get("api/v1/sales/")
+    etag = response.headers["ETag"]
+    
+    sale_data = {"item": "Item 3", "amount": 25.0, "quantity": 1, "date": "2023-10-03"}
+    assert authorized_client.post("api/v1/sales/", json=sale_data).status_code == 201
+    
+    response = authorized_client.get("api/v1/sales/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == len(test_sales) + 1
+
+@pytest.mark.parametrize("url", ["api/v1/sales/", "api/v1/analytics/summary"])
+def test_write_through_another_worker_changes_etag(authorized_client, token, test_sales, url):
+    # Worker B serves the first read and keeps the principal cached
+    worker_b = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+    before = worker_b.get(url)
+    owner_id = test_sales[0].owner_id
+    stale_principal = principal_cache.get(owner_id)
+
+    # Worker A takes the write; B's process never sees the invalidation
+    sale_data = {"item": "Item 3", "amount": 25.0, "quantity": 1, "date": "2023-10-03"}
+    assert authorized_client.post("api/v1/sales/", json=sale_data).status_code == 201
+    principal_cache.set(owner_id, stale_principal, tag=owner_id)
+
+    response = worker_b.get(url, headers={"If-None-Match": before.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before.headers["ETag"]
+    assert response.json() != before.json()
@@ -1,3 +1,4 @@
+from app.crud.pagination import encode_cursor
 from app.schemas.expense import ExpenseResponse
 
 def test_get_expense(authorized_client, test_expenses):
@@ -70,4 +71,43 @@ def test_update_expense(authorized_client, test_expenses):
     assert updated_expense.id == expense_id
     assert updated_expense.item == update_data["item"]
     assert updated_expense.amount == update_data["amount"]
-    assert updated_expense.category == update_data["category"]
\ No newline at end of file
+    assert updated_expense.category == update_data["category"]
+
+def test_get_expenses_paginated(authorized_client, test_expenses):
+    response = authorized_client.get("api/v1/expenses/?limit=1")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    cursor = response.headers["X-Next-Cursor"]
+    
+    response = authorized_client.get(f"api/v1/expenses/?limit=1&cursor={cursor}")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+def test_get_expenses_past_last_page(authorized_client, test_expenses):
+    # Walking past the last row ends on an empty page, as for sales
+    oldest = min(test_expenses, key=lambda expense: (expense.date, expense.id))
+    response = authorized_client.get(f"api/v1/expenses/?limit=1&cursor={encode_cursor(oldest.date, oldest.id)}")
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+def test_get_expenses_matches_expense_response(authorized_client, test_expenses):
+    response = authorized_client.get("api/v1/expenses/")
+    assert response.status_code == 200
+    assert "ETag" in response.headers
+    for expense in response.json():
+        assert expense == authorized_client.get(f"api/v1/expenses/{expense['id']}").json()
+
+def test_create_expenses_bulk(authorized_client, setup_user):
+    expenses_data = [
+        {"item": "Bulk 1", "amount": 10.0, "category": "Utilities", "date": "2023-10-01"},
+        {"item": "Bulk 2", "amount": 20.0, "category": "Utilities", "date": "2023-10-02"},
+    ]
+    response = authorized_client.post("api/v1/expenses/bulk", json=expenses_data)
+    assert response.status_code == 201
+    assert len(response.json()["ids"]) == 2
+    
+    breakdown = authorized_client.get("api/v1/analytics/expense-breakdown").json()
+    assert breakdown["labels"] == ["Utilities"]
+    assert breakdown["datasets"][0]["data"] == [30.0]
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+
+
+def test_export_sales_csv(authorized_client, test_sales):
+    response = authorized_client.get("api/v1/sales/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="sales.csv"'
+    
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["item"] for row in rows] == ["Item 1", "Item 2"]
+    assert rows[1]["quantity"] == "3"
+    assert rows[1]["date"] == "2023-10-02"
+
+def test_export_sales_ndjson_with_filters(authorized_client, test_sales):
+    response = authorized_client.get("api/v1/sales/export?format=ndjson&item_name=item&start_date=2023-10-02")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["item"] == "Item 2"
+    assert rows[0]["amount"] == 150.0
+
+def test_export_expenses_csv_with_date_range(authorized_client, test_expenses):
+    response = authorized_client.get("api/v1/expenses/export?start_date=2023-10-01&end_date=2023-10-01")
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["category"] for row in rows] == ["Utilities"]
+
+def test_export_without_rows_has_header_only(authorized_client):
+    response = authorized_client.get("api/v1/expenses/export")
+    assert response.status_code == 200
+    assert response.text.strip() == "id,item,category,amount,date,image_path,created_at"
+
+def test_export_invalid_format(authorized_client):
+    response = authorized_client.get("api/v1/sales/export?format=xml")
+    assert response.status_code == 422
+
+def test_export_invalid_date(authorized_client):
+    response = authorized_client.get("api/v1/sales/export?start_date=invalid")
+    assert response.status_code == 400
+
+def test_unauthorized_export(client):
+    response = client.get("api/v1/sales/export")
+    assert response.status_code == 401
@@ -0,0 +1,43 @@
+import time
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from app import main
+from app.core.config import settings
+from app.main import app
+from tests.conftest import engine
+
+
+def test_liveness(client):
+    response = client.get("health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+def test_readiness_waits_for_startup(client, monkeypatch):
+    # The test client is not entered as a context manager, so startup never runs
+    assert client.get("health/ready").status_code == 503
+
+    monkeypatch.setattr(app.state, "ready", True)
+    response = client.get("health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+def test_startup_survives_partition_failure(client, monkeypatch):
+    attempts = []
+    def ensure_future_partitions(conn):
+        attempts.append(conn)
+        if len(attempts) == 1:
+            raise OperationalError("CREATE TABLE", {}, Exception("lock timeout"))
+    monkeypatch.setattr(main, "ensure_future_partitions", ensure_future_partitions)
+    monkeypatch.setattr(main, "get_database", lambda: SimpleNamespace(engine=engine, engines=dict))
+    monkeypatch.setattr(settings, "partition_retry_seconds", 0.2)
+
+    with TestClient(app) as started:
+        # Serving, but not ready until a retry creates the partitions
+        assert started.get("health/live").status_code == 200
+        assert started.get("health/ready").status_code == 503
+        deadline = time.monotonic() + 5
+        while not app.state.ready and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert started.get("health/ready").status_code == 200
+    assert len(attempts) == 2
@@ -0,0 +1,53 @@
+import re
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+
+def metric_value(text, line_prefix):
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{line_prefix} not in metrics"
+    return float(match.group(1))
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(("/a",), value)
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1.0"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 2.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
+
+def test_metrics_endpoint(authorized_client, test_sales, monkeypatch):
+    assert authorized_client.get("metrics").status_code == 404
+    monkeypatch.setattr(settings, "internal_api_token", "secret")
+    headers = {"X-Internal-Token": "secret"}
+    before = authorized_client.get("metrics", headers=headers).text
+
+    authorized_client.get(f"api/v1/sales/{test_sales[0].id}")
+    response = authorized_client.get("metrics", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    # Labelled by route template, and the SQL the request ran is attributed to it
+    route = 'method="GET",route="/api/v1/sales/{sale_id}"'
+    assert metric_value(response.text, f'http_request_duration_seconds_count{{{route},status="200"}}') >= 1
+    statements = metric_value(response.text, f"http_request_db_statements_sum{{{route}}}")
+    if f"http_request_db_statements_sum{{{route}}}" in before:
+        statements -= metric_value(before, f"http_request_db_statements_sum{{{route}}}")
+    assert statements >= 1
+    assert metric_value(response.text, 'db_statements_total{engine="test"}') >= statements
+    assert 'db_pool_in_use{pool="primary"}' in response.text
+
+def test_metrics_accepts_bearer_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", "secret")
+    assert client.get("metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+    response = client.get("metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
@@ -0,0 +1,61 @@
+import pytest
+from datetime import date
+from sqlalchemy import text
+from app.db.partitions import (detach_partitions_before, ensure_partitions, is_partitioned, list_partitions,
+                               next_partition_start, partition_name, partition_start)
+from tests.conftest import engine
+
+
+def test_partition_boundaries():
+    assert partition_start(date(2023, 10, 17)) == date(2023, 10, 1)
+    assert partition_start(date(2023, 10, 17), "year") == date(2023, 1, 1)
+    assert next_partition_start(date(2023, 12, 1)) == date(2024, 1, 1)
+    assert next_partition_start(date(2023, 1, 1), "year") == date(2024, 1, 1)
+    assert partition_name("sales", date(2023, 2, 1)) == "sales_p2023_02"
+    assert partition_name("sales", date(2023, 1, 1), "year") == "sales_p2023"
+
+@pytest.fixture
+def probe_table():
+    # A scratch table partitioned like the migrated sales/expenses tables
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS partition_probe CASCADE"))
+        conn.execute(text("CREATE TABLE partition_probe (id int, date date NOT NULL) PARTITION BY RANGE (date)"))
+        conn.execute(text("CREATE TABLE partition_probe_default PARTITION OF partition_probe DEFAULT"))
+    yield "partition_probe"
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS partition_probe CASCADE"))
+        conn.execute(text(
+            "DROP TABLE IF EXISTS partition_probe_p2023_01, partition_probe_p2023_02, partition_probe_p2023_05"
+        ))
+
+def test_ensure_and_detach_partitions(session, probe_table):
+    with engine.begin() as conn:
+        assert is_partitioned(conn, probe_table)
+        assert not is_partitioned(conn, "sales")
+        
+        created = ensure_partitions(conn, date(2023, 1, 15), date(2023, 3, 2), tables=(probe_table,))
+        assert created == ["partition_probe_p2023_01", "partition_probe_p2023_02", "partition_probe_p2023_03"]
+        assert ensure_partitions(conn, date(2023, 1, 1), date(2023, 3, 1), tables=(probe_table,)) == []
+        
+        conn.execute(text("INSERT INTO partition_probe VALUES (1, '2023-01-10'), (2, '2023-03-10')"))
+        plan = conn.execute(text(
+            "EXPLAIN SELECT * FROM partition_probe WHERE date >= '2023-03-01' AND date < '2023-04-01'"
+        )).scalars().all()
+        assert not any("p2023_01" in line for line in plan)
+        
+        detached = detach_partitions_before(conn, probe_table, date(2023, 3, 1))
+        assert detached == ["partition_probe_p2023_01", "partition_probe_p2023_02"]
+        assert [name for name, _, _ in list_partitions(conn, probe_table)] == ["partition_probe_p2023_03"]
+        assert conn.execute(text("SELECT count(*) FROM partition_probe")).scalar() == 1
+
+def test_ensure_partitions_moves_rows_out_of_the_default_partition(session, probe_table):
+    with engine.begin() as conn:
+        # Dated past the existing partitions, so it lands in the default one
+        conn.execute(text("INSERT INTO partition_probe VALUES (1, '2023-05-10'), (2, '2023-07-01')"))
+
+        assert ensure_partitions(conn, date(2023, 5, 1), date(2023, 5, 1), tables=(probe_table,)) == [
+            "partition_probe_p2023_05"
+        ]
+        assert conn.execute(text("SELECT id FROM partition_probe_p2023_05")).scalars().all() == [1]
+        assert conn.execute(text("SELECT id FROM partition_probe_default")).scalars().all() == [2]
+        assert conn.execute(text("SELECT count(*) FROM partition_probe")).scalar() == 2
@@ -0,0 +1,33 @@
+import sqlite3
+import pytest
+from sqlalchemy import exc
+from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_records_checkouts_and_timeouts():
+    pool = InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01,
+        logging_name="test-pool"
+    )
+    stats = pool_stats("test-pool")
+    conn = pool.connect()
+
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    conn.close()
+
+    snapshot = stats.snapshot(pool)
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["peak_in_use"] == 1
+    assert snapshot["in_use"] == 0
+    assert snapshot["max_wait_ms"] >= 10
+
+def test_pool_stats_endpoint(client, monkeypatch):
+    assert client.get("api/v1/internal/pool-stats").status_code == 404
+
+    monkeypatch.setattr(settings, "internal_api_token", "secret")
+    response = client.get("api/v1/internal/pool-stats", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert {"size", "in_use", "overflow", "avg_wait_ms"} <= response.json()["primary"].keys()
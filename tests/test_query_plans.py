@@ -0,0 +1,74 @@
+import json
+import pytest
+from sqlalchemy import event
+from datetime import date
+from app.crud.pagination import encode_cursor
+from tests.conftest import engine
+
+# Every endpoint that reads sales, expenses or rollups. Each SQL statement they
+# run is EXPLAINed with sequential scans disabled: Postgres still picks a seq scan
+# when no index can serve the query, so any "Seq Scan" node means a missing index.
+ENDPOINTS = [
+    "api/v1/sales/",
+    "api/v1/sales/?item_name=Item",
+    "api/v1/sales/?limit=1&cursor={cursor}",
+    "api/v1/sales/{sale_id}",
+    "api/v1/expenses/",
+    "api/v1/expenses/?item_name=Expense",
+    "api/v1/expenses/?limit=1&cursor={cursor}",
+    "api/v1/expenses/{expense_id}",
+    "api/v1/analytics/summary",
+    "api/v1/analytics/summary?start_date=2023-10-01&end_date=2023-10-31",
+    "api/v1/analytics/monthly-summary?year=2023",
+    "api/v1/analytics/weekly-summary?start_date=2023-10-01&end_date=2023-10-31",
+    "api/v1/analytics/top-selling",
+    "api/v1/analytics/top-selling?start_date=2023-10-01&end_date=2023-10-31",
+    "api/v1/analytics/expense-breakdown",
+    "api/v1/analytics/expense-breakdown?start_date=2023-10-01&end_date=2023-10-31",
+    "api/v1/analytics/dashboard?year=2023",
+    "api/v1/search/items?q=Item",
+    "api/v1/analytics/timeseries?granularity=day&start_date=2023-10-01&end_date=2023-10-31",
+    "api/v1/analytics/timeseries?granularity=month&start_date=2023-01-01&item=Item&category=Utilities",
+    "api/v1/analytics/dashboard?year=2023&start_date=2023-10-01&end_date=2023-10-31",
+]
+
+
+@pytest.fixture
+def captured_statements():
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+def seq_scans(plan):
+    found = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_endpoint_queries_use_indexes(authorized_client, test_sales, test_expenses, captured_statements, url):
+    url = url.format(
+        sale_id=test_sales[0].id,
+        expense_id=test_expenses[0].id,
+        cursor=encode_cursor(date(2023, 10, 3), 0),
+    )
+    captured_statements.clear()
+    
+    response = authorized_client.get(url)
+    assert response.status_code == 200
+    assert captured_statements
+    
+    with engine.connect() as connection:
+        with connection.begin():
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            for statement, parameters in captured_statements:
+                plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                assert not seq_scans(plan[0]["Plan"]), f"sequential scan in plan for {url}:\n{statement}"
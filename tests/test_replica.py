@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.session import Database, get_database
+from app.models.base import Base
+from app.services.cache import principal_cache, recent_writes
+from tests.conftest import DATABASE_URL
+
+# A second local database stands in for the replica. Nothing replicates into it:
+# tests copy rows over by hand to simulate replay, so reads that reach it are
+# easy to tell apart from reads served by the primary.
+REPLICA_URL = DATABASE_URL.set(database=f"{DATABASE_URL.database}_replica")
+
+
+@pytest.fixture
+def replica(session, monkeypatch):
+    engine = create_engine(REPLICA_URL)
+    try:
+        Base.metadata.drop_all(bind=engine)
+    except OperationalError:
+        pytest.skip(f"replica test database {REPLICA_URL.database} is not available")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(get_database(), "ReplicaSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    recent_writes.clear()
+    yield engine
+    engine.dispose()
+
+def replicate_user(replica, user_id: int, data_version: int) -> None:
+    with replica.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        conn.execute(
+            text("INSERT INTO users (id, email, password, data_version) VALUES (:id, 'r@example.com', 'x', :version)"),
+            {"id": user_id, "version": data_version}
+        )
+
+def test_reads_go_to_replica(authorized_client, setup_user, test_sales, replica):
+    replicate_user(replica, setup_user["id"], 0)
+    
+    # The sales exist only on the primary, so an empty list means the replica answered
+    assert authorized_client.get("api/v1/sales/").json() == []
+    assert authorized_client.get("api/v1/analytics/summary").json()["datasets"][0]["data"] == [0.0, 0.0, 0.0]
+    # Single-row reads stay on the primary
+    assert authorized_client.get(f"api/v1/sales/{test_sales[0].id}").status_code == 200
+
+def test_reads_follow_own_writes(authorized_client, setup_user, test_sales, replica):
+    replicate_user(replica, setup_user["id"], 0)
+    sale_data = {"item": "Item 3", "amount": 25.0, "quantity": 1, "date": "2023-10-03"}
+    assert authorized_client.post("api/v1/sales/", json=sale_data).status_code == 201
+    
+    # Within the read-your-writes window
+    assert len(authorized_client.get("api/v1/sales/").json()) == 3
+    
+    # After it, the replica is still one data version behind the primary
+    recent_writes.clear()
+    assert len(authorized_client.get("api/v1/sales/").json()) == 3
+    
+    # Once the replica has caught up, reads move back to it
+    replicate_user(replica, setup_user["id"], 1)
+    assert authorized_client.get("api/v1/sales/").json() == []
+
+def test_reads_fall_back_when_user_not_replicated(authorized_client, test_sales, replica):
+    assert len(authorized_client.get("api/v1/sales/").json()) == 2
+
+def test_reads_follow_writes_through_other_workers(authorized_client, setup_user, test_sales, replica):
+    replicate_user(replica, setup_user["id"], 0)
+    assert authorized_client.get("api/v1/sales/").json() == []
+    stale_principal = principal_cache.get(setup_user["id"])
+
+    # Another worker took the write: this one neither saw it nor invalidated anything
+    sale_data = {"item": "Item 3", "amount": 25.0, "quantity": 1, "date": "2023-10-03"}
+    assert authorized_client.post("api/v1/sales/", json=sale_data).status_code == 201
+    recent_writes.clear()
+    principal_cache.set(setup_user["id"], stale_principal, tag=setup_user["id"])
+
+    # The replica is still at version 0, the primary at 1
+    assert len(authorized_client.get("api/v1/sales/").json()) == 3
+
+def test_replica_engine_is_read_only(replica, monkeypatch):
+    monkeypatch.setattr(settings, "database_replica_names", REPLICA_URL.database)
+    database = Database()
+    try:
+        with database.replica_engine.connect() as conn:
+            with pytest.raises(DBAPIError, match="read-only transaction"):
+                conn.execute(text("CREATE TABLE read_only_probe (id int)"))
+    finally:
+        database.replica_engine.dispose()
+        database.engine.dispose()
@@ -0,0 +1,80 @@
+import msgpack
+from app.api.compression import accepted_encodings, negotiated_encoding
+from app.api.responses import preferred_format
+
+
+def create_sales(authorized_client, count):
+    sales_data = [
+        {"item": f"Bulk {n}", "amount": 10.5, "quantity": 1, "date": "2023-10-01"}
+        for n in range(count)
+    ]
+    assert authorized_client.post("api/v1/sales/bulk", json=sales_data).status_code == 201
+
+def test_preferred_format():
+    assert preferred_format(None) == "json"
+    assert preferred_format("application/json") == "json"
+    assert preferred_format("*/*") == "json"
+    assert preferred_format("application/msgpack") == "msgpack"
+    assert preferred_format("application/x-msgpack, */*") == "msgpack"
+    assert preferred_format("application/json, application/msgpack;q=0.5") == "json"
+    assert preferred_format("application/msgpack;q=0") == "json"
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("br;q=0, gzip;q=0.8") == {"gzip"}
+    assert accepted_encodings(None) == set()
+
+def test_negotiated_encoding():
+    assert negotiated_encoding("gzip, deflate, br") == "br"
+    assert negotiated_encoding("br;q=0, gzip") == "gzip"
+    assert negotiated_encoding("deflate") == "identity"
+    assert negotiated_encoding(None) == "identity"
+
+def test_msgpack_matches_json(authorized_client, test_sales, test_expenses):
+    for url in ["api/v1/sales/", "api/v1/analytics/summary", f"api/v1/sales/{test_sales[0].id}"]:
+        as_json = authorized_client.get(url)
+        as_msgpack = authorized_client.get(url, headers={"Accept": "application/msgpack"})
+        assert as_msgpack.status_code == 200
+        assert as_msgpack.headers["Content-Type"] == "application/msgpack"
+        assert "Accept" in as_msgpack.headers["Vary"]
+        assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+
+def test_etag_depends_on_format(authorized_client, test_sales):
+    etag = authorized_client.get("api/v1/sales/").headers["ETag"]
+
+    response = authorized_client.get("api/v1/sales/", headers={"Accept": "application/msgpack", "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_etag_depends_on_content_encoding(authorized_client):
+    create_sales(authorized_client, 50)
+    plain = authorized_client.get("api/v1/sales/", headers={"Accept-Encoding": "identity"})
+    gzipped = authorized_client.get("api/v1/sales/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["ETag"] != plain.headers["ETag"]
+
+    response = authorized_client.get(
+        "api/v1/sales/", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == gzipped.headers["ETag"]
+
+def test_large_responses_are_compressed(authorized_client):
+    create_sales(authorized_client, 50)
+    plain = authorized_client.get("api/v1/sales/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+
+    response = authorized_client.get("api/v1/sales/", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert int(response.headers["Content-Length"]) < len(plain.content)
+    # httpx decodes gzip, and brotli when the brotli package is installed
+    assert response.json() == plain.json()
+
+    response = authorized_client.get("api/v1/sales/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json() == plain.json()
+
+def test_small_responses_are_not_compressed(authorized_client, test_sales):
+    response = authorized_client.get("api/v1/analytics/summary", headers={"Accept-Encoding": "br"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,122 @@
+from app.crud.rollup import rebuild_rollups
+from app.models.rollup import DailyRollup, ItemTotal
+
+
+def summary_totals(client, start_date="2023-10-01", end_date="2023-10-31"):
+    response = client.get(f"api/v1/analytics/summary?start_date={start_date}&end_date={end_date}")
+    assert response.status_code == 200
+    return response.json()["datasets"][0]["data"]
+
+def test_rollup_tracks_sale_writes(authorized_client):
+    sale_data = {"item": "Widget", "amount": 100.0, "quantity": 2, "date": "2023-10-05"}
+    response = authorized_client.post("api/v1/sales/", json=sale_data)
+    assert response.status_code == 201
+    sale_id = response.json()["id"]
+    assert summary_totals(authorized_client) == [100.0, 0.0, 100.0]
+    
+    response = authorized_client.put(f"api/v1/sales/{sale_id}", json={"amount": 40.0})
+    assert response.status_code == 200
+    assert summary_totals(authorized_client) == [40.0, 0.0, 40.0]
+    
+    # Moving the sale to another month moves its totals as well
+    response = authorized_client.put(f"api/v1/sales/{sale_id}", json={"date": "2023-11-05"})
+    assert response.status_code == 200
+    assert summary_totals(authorized_client) == [0.0, 0.0, 0.0]
+    assert summary_totals(authorized_client, "2023-11-01", "2023-11-30") == [40.0, 0.0, 40.0]
+    
+    response = authorized_client.delete(f"api/v1/sales/{sale_id}")
+    assert response.status_code == 204
+    assert summary_totals(authorized_client, "2023-11-01", "2023-11-30") == [0.0, 0.0, 0.0]
+
+def test_rollup_tracks_expense_writes(authorized_client):
+    expense_data = {"item": "Paper", "amount": 25.0, "category": "Office Supplies", "date": "2023-10-05"}
+    response = authorized_client.post("api/v1/expenses/", json=expense_data)
+    assert response.status_code == 201
+    expense_id = response.json()["id"]
+    assert summary_totals(authorized_client) == [0.0, 25.0, -25.0]
+    
+    response = authorized_client.put(f"api/v1/expenses/{expense_id}", json={"amount": 30.0})
+    assert response.status_code == 200
+    assert summary_totals(authorized_client) == [0.0, 30.0, -30.0]
+    
+    response = authorized_client.delete(f"api/v1/expenses/{expense_id}")
+    assert response.status_code == 204
+    assert summary_totals(authorized_client) == [0.0, 0.0, 0.0]
+
+def test_rebuild_rollups(session, setup_user, test_sales, test_expenses):
+    rows = session.query(DailyRollup).order_by(DailyRollup.date).all()
+    assert [(row.income, row.expenses, row.quantity, row.sales_count, row.expenses_count) for row in rows] == [
+        (50.0, 30.0, 1, 1, 1),
+        (150.0, 80.0, 3, 1, 1),
+    ]
+    
+    session.query(DailyRollup).delete()
+    session.commit()
+    rebuild_rollups(session)
+    assert session.query(DailyRollup).count() == 2
+
+def test_item_totals_track_sale_writes(authorized_client):
+    def top_selling():
+        response = authorized_client.get("api/v1/analytics/top-selling")
+        assert response.status_code == 200
+        top = response.json()
+        assert top["mode"] == "precomputed"
+        return top["labels"], top["datasets"][0]["data"]
+    
+    sale_data = {"item": "Widget", "amount": 100.0, "quantity": 2, "date": "2023-10-05"}
+    sale_id = authorized_client.post("api/v1/sales/", json=sale_data).json()["id"]
+    bulk = [{"item": "Gadget", "amount": 10.0, "quantity": 1, "date": "2023-10-05"}] * 3
+    assert authorized_client.post("api/v1/sales/bulk", json=bulk).status_code == 201
+    assert top_selling() == (["Gadget", "Widget"], [3, 2])
+    
+    # Renaming the sale moves its totals to the new item
+    authorized_client.put(f"api/v1/sales/{sale_id}", json={"item": "Gizmo", "quantity": 5})
+    assert top_selling() == (["Gizmo", "Gadget"], [5, 3])
+    
+    authorized_client.delete(f"api/v1/sales/{sale_id}")
+    assert top_selling() == (["Gadget"], [3])
+
+def test_rebuild_item_totals(session, setup_user, test_sales):
+    session.query(ItemTotal).delete()
+    session.commit()
+    rebuild_rollups(session)
+    
+    rows = session.query(ItemTotal).order_by(ItemTotal.item).all()
+    assert [(row.item, row.quantity, row.revenue, row.sales_count) for row in rows] == [
+        ("Item 1", 1, 50.0, 1),
+        ("Item 2", 3, 150.0, 1),
+    ]
+
+def test_incremental_rollups_match_rebuild(authorized_client, session):
+    def snapshot():
+        session.expire_all()
+        days = session.query(DailyRollup).order_by(DailyRollup.owner_id, DailyRollup.date).all()
+        items = session.query(ItemTotal).order_by(ItemTotal.owner_id, ItemTotal.item).all()
+        return (
+            [(row.date, row.income, row.expenses, row.quantity, row.sales_count, row.expenses_count) for row in days],
+            [(row.item, row.quantity, row.revenue, row.sales_count) for row in items],
+        )
+
+    # Amounts that do not add up exactly as floats
+    bulk = [{"item": "Gadget", "amount": amount, "quantity": 1, "date": "2023-10-05"} for amount in (0.1, 0.2, 0.7)]
+    assert authorized_client.post("api/v1/sales/bulk", json=bulk).status_code == 201
+    sale_ids = []
+    for amount in (19.99, 0.01, 33.33):
+        sale = {"item": "Widget", "amount": amount, "quantity": 2, "date": "2023-10-06"}
+        sale_ids.append(authorized_client.post("api/v1/sales/", json=sale).json()["id"])
+    expense = {"item": "Paper", "amount": 0.3, "category": "Office Supplies", "date": "2023-10-06"}
+    expense_id = authorized_client.post("api/v1/expenses/", json=expense).json()["id"]
+
+    authorized_client.put(f"api/v1/sales/{sale_ids[0]}", json={"amount": 0.1})
+    authorized_client.delete(f"api/v1/sales/{sale_ids[1]}")
+    # Emptying a day and an item removes their rows, as a rebuild would have none
+    authorized_client.put(f"api/v1/sales/{sale_ids[2]}", json={"item": "Gizmo", "date": "2023-10-07"})
+    authorized_client.delete(f"api/v1/sales/{sale_ids[2]}")
+    authorized_client.delete(f"api/v1/expenses/{expense_id}")
+
+    incremental = snapshot()
+    assert [row[0].isoformat() for row in incremental[0]] == ["2023-10-05", "2023-10-06"]
+    assert [row[0] for row in incremental[1]] == ["Gadget", "Widget"]
+
+    rebuild_rollups(session)
+    assert snapshot() == incremental
@@ -59,3 +59,66 @@ def test_create_sale(authorized_client, setup_user):
     assert new_sale["quantity"] == sale_data["quantity"]
     assert new_sale["owner_id"] == setup_user["id"]
     
+
+def test_get_sales_paginated(authorized_client, test_sales):
+    response = authorized_client.get("api/v1/sales/?limit=1")
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page) == 1
+    cursor = response.headers["X-Next-Cursor"]
+    
+    response = authorized_client.get(f"api/v1/sales/?limit=1&cursor={cursor}")
+    assert response.status_code == 200
+    second_page = response.json()
+    assert len(second_page) == 1
+    assert "X-Next-Cursor" not in response.headers
+    
+    # Newest first, and every sale appears exactly once
+    assert first_page[0]["date"] > second_page[0]["date"]
+    assert {first_page[0]["id"], second_page[0]["id"]} == {sale.id for sale in test_sales}
+    
+def test_get_sales_matches_sale_response(authorized_client, test_sales):
+    # The list is serialized from column rows; it must render each sale exactly
+    # like the single-sale endpoint, which goes through SaleResponse
+    response = authorized_client.get("api/v1/sales/")
+    assert response.status_code == 200
+    assert "ETag" in response.headers
+    for sale in response.json():
+        assert sale == authorized_client.get(f"api/v1/sales/{sale['id']}").json()
+
+def test_get_sales_invalid_cursor(authorized_client, test_sales):
+    response = authorized_client.get("api/v1/sales/?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+def test_create_sales_bulk(authorized_client, setup_user):
+    sales_data = [
+        {"item": "Bulk 1", "amount": 10.0, "quantity": 1, "date": "2023-10-01"},
+        {"item": "Bulk 2", "amount": 20.0, "quantity": 2, "date": "2023-10-01"},
+        {"item": "Bulk 3", "amount": 30.0, "quantity": 3, "date": "2023-10-02"},
+    ]
+    response = authorized_client.post("api/v1/sales/bulk", json=sales_data)
+    assert response.status_code == 201
+    ids = response.json()["ids"]
+    assert len(ids) == 3
+    
+    for sale_id, sale_data in zip(ids, sales_data):
+        sale = SaleResponse(**authorized_client.get(f"api/v1/sales/{sale_id}").json())
+        assert sale.item == sale_data["item"]
+        assert sale.owner_id == setup_user["id"]
+    
+    summary = authorized_client.get("api/v1/analytics/summary").json()
+    assert summary["datasets"][0]["data"][0] == 60.0
+
+def test_create_sales_bulk_validates_every_row(authorized_client):
+    sales_data = [
+        {"item": "Bulk 1", "amount": 10.0, "quantity": 1, "date": "2023-10-01"},
+        {"item": "Bulk 2", "amount": "lots", "quantity": 2, "date": "2023-10-01"},
+    ]
+    response = authorized_client.post("api/v1/sales/bulk", json=sales_data)
+    assert response.status_code == 422
+    assert authorized_client.get("api/v1/sales/").json() == []
+
+def test_create_sales_bulk_empty(authorized_client):
+    response = authorized_client.post("api/v1/sales/bulk", json=[])
+    assert response.status_code == 400
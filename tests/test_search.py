@@ -0,0 +1,26 @@
+from app.crud.search import escape_like
+
+
+def test_search_items_ranks_by_similarity(authorized_client, test_sales, test_expenses):
+    response = authorized_client.get("api/v1/search/items?q=Item 2")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    
+    assert results[0] == {"item": "Item 2", "source": "sale", "score": 1.0, "count": 1}
+    assert {result["item"] for result in results} >= {"Item 1", "Item 2"}
+    assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+
+def test_search_items_covers_expenses_and_limit(authorized_client, test_sales, test_expenses):
+    results = authorized_client.get("api/v1/search/items?q=Expense&limit=1").json()["results"]
+    assert len(results) == 1
+    assert results[0]["source"] == "expense"
+    
+    assert authorized_client.get("api/v1/search/items?q=Expense&limit=0").status_code == 422
+
+def test_item_filters_treat_wildcards_literally(authorized_client, test_sales, test_expenses):
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+    
+    assert authorized_client.get("api/v1/sales/?item_name=Item").status_code == 200
+    assert len(authorized_client.get("api/v1/sales/?item_name=Item").json()) == 2
+    assert authorized_client.get("api/v1/sales/?item_name=%25").json() == []
+    assert authorized_client.get("api/v1/sales/?item_name=Item_1").json() == []
@@ -0,0 +1,49 @@
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.crud.sales import get_sales
+from app.db.slow_queries import SlowQueryLog, slow_query_log, track_slow_queries
+from tests.conftest import DATABASE_URL
+
+
+def test_slow_queries_are_logged_with_caller_and_plan(session, monkeypatch):
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    # A separate engine, so the zero threshold does not outlive this test
+    engine = create_engine(DATABASE_URL)
+    track_slow_queries(engine, "test-slow")
+    slow_query_log.clear()
+    db = sessionmaker(bind=engine)()
+    try:
+        get_sales(db, 1, None, 10)
+    finally:
+        db.close()
+
+    entry = slow_query_log.entries()[0]
+    assert entry["engine"] == "test-slow"
+    assert entry["statement"].startswith("SELECT")
+    assert entry["caller"].startswith("app.crud.sales.get_sales:")
+    assert entry["route"] is None
+
+    deadline = time.monotonic() + 5
+    while slow_query_log.entries()[0]["plan_status"] == "pending" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    entry = slow_query_log.entries()[0]
+    assert entry["plan_status"] == "done"
+    assert "actual time" in entry["plan"]
+    engine.dispose()
+
+def test_slow_query_log_is_bounded():
+    log = SlowQueryLog(2)
+    for n in range(3):
+        log.record({"n": n})
+    assert [entry["n"] for entry in log.entries()] == [2, 1]
+    assert log.recorded == 3
+
+def test_slow_queries_endpoint(client, monkeypatch):
+    assert client.get("api/v1/internal/slow-queries").status_code == 404
+
+    monkeypatch.setattr(settings, "internal_api_token", "secret")
+    response = client.get("api/v1/internal/slow-queries", headers={"X-Internal-Token": "secret"})
+    assert response.status_code == 200
+    assert {"enabled", "threshold_ms", "recorded", "queries"} <= response.json().keys()
@@ -1,7 +1,10 @@
+from app.models.user import User
 from app.schemas.user import UserResponse
 from app.schemas.token import Token
 from app.core.config import settings
+from app.core import security
 from jose import jwt
+import threading
 import pytest
 
 
@@ -41,8 +44,22 @@ def test_login_user_invalid_credentials(setup_user, client):
     assert response.status_code == 401
     assert response.json() == {
         "detail": "Invalid credentials",}
-    
-    
 
+def test_login_returns_429_when_hashing_is_saturated(setup_user, client, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(security, "_hash_slots", slots)
     
-    
\ No newline at end of file
+    response = client.post(
+        "api/v1/auth/login",
+        data={
+            "username": setup_user["email"],
+            "password": "password123"
+            })
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+def test_password_hash_uses_configured_rounds(setup_user, session):
+    user = session.query(User).filter(User.id == setup_user["id"]).one()
+    assert security.pwd_context.identify(user.password) == "bcrypt"
+    assert user.password.split("$")[2] == f"{settings.bcrypt_rounds:02d}"